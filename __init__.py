@@ -2,11 +2,16 @@
 Company Knowledge Assistant - Source Package
 """
 
-from src.config import Config
-from src.document_processor import DocumentProcessor
-from src.retriever import Retriever
-from src.generator import Generator
-from src.rag_pipeline import RAGPipeline
+import importlib
+
+# Public name → module; loaded on first attribute access (PEP 562)
+_LAZY = {
+    "Config": "src.config",
+    "DocumentProcessor": "src.document_processor",
+    "Retriever": "src.retriever",
+    "Generator": "src.generator",
+    "RAGPipeline": "src.rag_pipeline"
+}
 
 __all__ = [
     "Config",
@@ -14,4 +19,12 @@ __all__ = [
     "Retriever",
     "Generator",
     "RAGPipeline"
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
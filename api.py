@@ -0,0 +1,188 @@
+"""
+HTTP Query Service (ASGI)
+Run: uvicorn api:app --host 0.0.0.0 --port 8000 --workers 2
+"""
+
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Annotated, List
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field, StringConstraints
+
+from src.config import Config
+from src.metrics import REGISTRY, render_prometheus, render_provider_stats
+from src.shared_pipeline import get_pipeline, reload_if_changed
+
+
+# Bounded pool for blocking pipeline calls (created in lifespan)
+executor = None
+
+# Requests running or waiting for a worker; more than this → 503
+slots = None
+
+state = {"ready": False, "error": None}
+
+
+# Empty and whitespace-only questions are rejected with 422
+Question = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)]
+
+
+class QueryRequest(BaseModel):
+    question: Question
+    use_web_search: bool = False
+
+
+class BatchQueryRequest(BaseModel):
+    questions: List[Question] = Field(min_length=1, max_length=Config.API_MAX_BATCH)
+    use_web_search: bool = False
+
+
+def _load_pipeline():
+    """Build the shared pipeline in the background (readiness waits for it)"""
+    try:
+        get_pipeline()
+        state["ready"] = True
+    except Exception as e:
+        state["error"] = str(e)
+        print(f"❌ Pipeline failed to load: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    global executor, slots
+    executor = ThreadPoolExecutor(max_workers=Config.API_MAX_WORKERS, thread_name_prefix="rag")
+    slots = asyncio.Semaphore(Config.API_MAX_PENDING)
+    state.update(ready=False, error=None)
+    threading.Thread(target=_load_pipeline, daemon=True).start()
+    yield
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+app = FastAPI(title="Company Knowledge Assistant API", lifespan=lifespan)
+
+
+async def _take_slot():
+    """Reserve a request slot or fail fast with 503"""
+    if not state["ready"]:
+        raise HTTPException(status_code=503, detail="Pipeline is not ready")
+    if slots.locked():
+        raise HTTPException(status_code=503, detail="Too many requests in progress")
+    await slots.acquire()
+
+
+def _release_slot(loop):
+    """Give a slot back from a worker thread"""
+    try:
+        loop.call_soon_threadsafe(slots.release)
+    except RuntimeError:
+        pass  # Event loop already closed (shutdown)
+
+
+async def _run(func, *args):
+    """Run a blocking call on the worker pool with a slot and a timeout"""
+    await _take_slot()
+
+    # The slot is held until the work really ends, even after a timeout,
+    # so timed-out calls still count against the limit
+    loop = asyncio.get_running_loop()
+    future = executor.submit(func, *args)
+    future.add_done_callback(lambda _: _release_slot(loop))
+
+    try:
+        return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout=Config.API_REQUEST_TIMEOUT)
+    except asyncio.TimeoutError:
+        future.cancel()  # Only drops it if it has not started yet (then the slot is freed)
+        raise HTTPException(status_code=504, detail="Request timed out")
+
+
+@app.get("/health")
+async def health():
+    """Liveness: the process is up"""
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+async def ready():
+    """Readiness: the index and models are loaded"""
+    if not state["ready"]:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "loading" if state["error"] is None else "failed", "error": state["error"]}
+        )
+    return {"status": "ready"}
+
+
+@app.get("/metrics")
+async def metrics():
+    """Per-stage latency quantiles, tokens and cache hits (Prometheus text format)"""
+    text = render_prometheus(REGISTRY)
+    generator = get_pipeline().generator if state["ready"] else None
+    if hasattr(generator, "provider_stats"):
+        text += render_provider_stats(generator.provider_stats())
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+
+@app.post("/query")
+async def query(request: QueryRequest):
+    """Answer one question"""
+    def work():
+        reload_if_changed()
+        return get_pipeline().query(request.question, use_web_search=request.use_web_search)
+
+    return await _run(work)
+
+
+@app.post("/query/batch")
+async def query_batch(request: BatchQueryRequest):
+    """Answer many questions with one batched retrieval"""
+    def work():
+        reload_if_changed()
+        return get_pipeline().query_batch(
+            request.questions,
+            use_web_search=request.use_web_search,
+            max_workers=Config.API_BATCH_WORKERS
+        )
+
+    return {"results": await _run(work)}
+
+
+@app.post("/query/stream")
+async def query_stream(request: QueryRequest):
+    """Answer one question as newline-delimited JSON events"""
+    await _take_slot()
+
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    done = object()
+
+    def produce():
+        try:
+            reload_if_changed()
+            for event in get_pipeline().stream_query(request.question, use_web_search=request.use_web_search):
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, {"type": "error", "error": str(e)})
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, done)
+            _release_slot(loop)
+
+    async def events():
+        deadline = loop.time() + Config.API_REQUEST_TIMEOUT
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=max(0, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                yield json.dumps({"type": "error", "error": "Request timed out"}) + "\n"
+                return
+            if event is done:
+                return
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+
+    loop.run_in_executor(executor, produce)
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
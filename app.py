@@ -3,13 +3,11 @@
 نظام ذكي للإجابة على استفساراتك حول سياسات المركز
 """
 
+import requests
 import streamlit as st
 from src.config import Config
-from src.document_processor import DocumentProcessor
-from src.retriever import Retriever
-from src.generator import Generator
-from src.rag_pipeline import RAGPipeline
-from src.utils import create_directories, check_pdf_files
+from src.questions import QUICK_QUESTIONS
+from src.shared_pipeline import get_pipeline, reload_if_changed
 
 # Page Configuration
 st.set_page_config(
@@ -113,45 +111,40 @@ st.markdown("""
 
 
 def initialize_pipeline():
-    """Initialize RAG pipeline"""
-    Config.setup()
-    create_directories()
-    
-    retriever = Retriever(
-        embedding_model=Config.EMBEDDING_MODEL,
-        top_k=Config.TOP_K,
-        vector_store_path=Config.VECTOR_STORE_PATH
-    )
-    
-    generator = Generator(
-        model=Config.LLM_MODEL,
-        temperature=Config.LLM_TEMPERATURE
-    )
-    
-    # Load or build vector store
-    if not retriever.load_vector_store():
-        pdf_paths = Config.get_pdf_paths()
-        if not check_pdf_files(pdf_paths):
-            st.error("❌ ملفات PDF غير موجودة في data/pdfs/")
-            st.stop()
-        
-        processor = DocumentProcessor(
-            chunk_size=Config.CHUNK_SIZE,
-            chunk_overlap=Config.CHUNK_OVERLAP
+    """Get the RAG pipeline shared by all sessions in this process"""
+    try:
+        pipeline = get_pipeline()
+    except FileNotFoundError:
+        st.error("❌ لم يتم العثور على الفهرس. شغّل: python build_index.py")
+        st.stop()
+    
+    # Pick up an index rebuilt on disk since it was loaded
+    reload_if_changed()
+    return pipeline
+
+
+def ask(question):
+    """Answer a question through the HTTP API (if API_URL is set) or locally"""
+    if Config.API_URL:
+        response = requests.post(
+            f"{Config.API_URL.rstrip('/')}/query",
+            json={"question": question},
+            timeout=Config.API_REQUEST_TIMEOUT
         )
-        chunks = processor.process_pdfs(pdf_paths)
-        retriever.create_vector_store(chunks)
-    
-    return RAGPipeline(retriever, generator, enable_cache=Config.ENABLE_CACHE)
+        response.raise_for_status()
+        return response.json()
+    return pipeline.query(question)
 
 
 # Initialize
 if 'messages' not in st.session_state:
     st.session_state.messages = []
 
-if 'pipeline' not in st.session_state:
+# Thin client mode: no local index or models
+pipeline = None
+if not Config.API_URL:
     with st.spinner("جاري التهيئة..."):
-        st.session_state.pipeline = initialize_pipeline()
+        pipeline = initialize_pipeline()
 
 
 # Sidebar
@@ -169,17 +162,10 @@ with st.sidebar:
     <h4 style='text-align: right; direction: rtl;'>أسئلة سريعة</h4>
     """, unsafe_allow_html=True)
     
-    questions = [
-        "كم مدة الإجازة السنوية؟",
-        "ما سياسة الاستقطاب والتوظيف؟",
-        "ما مدة فترة الاختبار؟",
-        "ما الموارد المالية للمركز؟"
-    ]
-    
-    for q in questions:
+    for q in QUICK_QUESTIONS:
         if st.button(q, key=f"q_{q}", use_container_width=True):
             st.session_state.messages.append({"role": "user", "content": q})
-            result = st.session_state.pipeline.query(q)
+            result = ask(q)
             st.session_state.messages.append({"role": "assistant", "content": result["answer"]})
             st.rerun()
     
@@ -213,7 +199,7 @@ if prompt := st.chat_input("اكتب سؤالك هنا..."):
         st.markdown(prompt)
     
     with st.spinner("جاري البحث..."):
-        result = st.session_state.pipeline.query(prompt)
+        result = ask(prompt)
     
     st.session_state.messages.append({"role": "assistant", "content": result["answer"]})
     
@@ -0,0 +1,3 @@
+"""
+Offline benchmarks (no API keys, network or Redis needed)
+"""
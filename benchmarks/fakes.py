@@ -0,0 +1,153 @@
+"""
+Offline stand-ins for OpenAI embeddings, chat models and Redis
+"""
+
+import hashlib
+import re
+import threading
+import time
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Deterministic bag-of-words embeddings: each token is hashed to a
+    dimension and a sign, then the vector is L2-normalized.
+    Texts sharing words end up close, so retrieval behaves sensibly.
+    """
+
+    def __init__(self, size=256, latency=0.0):
+        """
+        Args:
+            size: vector dimensions
+            latency: seconds slept per call (simulates the embeddings API)
+        """
+        self.size = size
+        self.latency = latency
+
+    def _embed(self, text):
+        vector = np.zeros(self.size, dtype=np.float32)
+        for token in TOKEN_PATTERN.findall(text.lower()):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            vector[value % self.size] += 1.0 if (value >> 63) else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts):
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model that answers with a fixed text after a configurable delay,
+    and reports whitespace token counts as usage metadata.
+    """
+
+    answer: str = "هذه إجابة تجريبية من نموذج وهمي لقياس الأداء."
+    latency: float = 0.0              # Seconds until the full answer
+    first_token_latency: float = 0.0  # Seconds until the first streamed chunk
+
+    @property
+    def _llm_type(self):
+        return "fake-chat"
+
+    def _usage(self, messages):
+        input_tokens = sum(len(str(m.content).split()) for m in messages)
+        output_tokens = len(self.answer.split())
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens
+        }
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.latency)
+        message = AIMessage(content=self.answer, usage_metadata=self._usage(messages))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        words = self.answer.split(" ")
+        time.sleep(self.first_token_latency)
+        per_word = max(0.0, self.latency - self.first_token_latency) / max(1, len(words))
+
+        for i, word in enumerate(words):
+            if i:
+                time.sleep(per_word)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word if i == 0 else " " + word))
+
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=self._usage(messages)))
+
+
+class InMemoryCache:
+    """Thread-safe dict with TTLs, exposing the Redis calls RAGPipeline uses"""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.time():
+                del self._data[key]
+                return None
+            return value
+
+    def setex(self, key, ttl, value):
+        with self._lock:
+            self._data[key] = (value, time.time() + ttl)
+
+    def set(self, key, value, nx=False, px=None):
+        """SET with NX / PX (milliseconds), as RedisLease uses it"""
+        with self._lock:
+            entry = self._data.get(key)
+            if nx and entry is not None and entry[1] >= time.time():
+                return None
+            self._data[key] = (value, time.time() + px / 1000 if px else float("inf"))
+            return True
+
+    def exists(self, key):
+        return int(self.get(key) is not None)
+
+    def eval(self, script, numkeys, key, token):
+        """Only RedisLease.RELEASE_SCRIPT: delete the key if it holds token"""
+        with self._lock:
+            if self._data.get(key, (None,))[0] == token:
+                del self._data[key]
+                return 1
+            return 0
+
+    def ttl(self, key):
+        """Seconds left like Redis TTL: -2 if missing, -1 if no expiry"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[1] < time.time():
+                return -2
+            if entry[1] == float("inf"):
+                return -1
+            return int(entry[1] - time.time())
+
+    def dbsize(self):
+        with self._lock:
+            return len(self._data)
+
+    def flushdb(self):
+        with self._lock:
+            self._data.clear()
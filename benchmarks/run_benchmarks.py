@@ -0,0 +1,360 @@
+"""
+Offline Benchmark Suite
+Run: python -m benchmarks.run_benchmarks --output bench_results.json
+
+Uses HashingEmbeddings / FakeChatModel / InMemoryCache, so no API keys,
+network or Redis are needed. Compare against a previous run with
+--baseline old.json to fail on regressions.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from langchain_core.documents import Document
+
+from benchmarks.fakes import HashingEmbeddings, FakeChatModel, InMemoryCache
+from src.config import Config
+from src.document_processor import DocumentProcessor
+from src.generator import Generator
+from src.metrics import MetricsRegistry
+from src.rag_pipeline import RAGPipeline
+from src.retriever import Retriever
+
+
+# Heavy modules each entry point must NOT load at import time (lazy on first use)
+LAZY_IMPORTS = {
+    "src.config": ["streamlit"],
+    "src.retriever": ["langchain_openai", "langchain_community", "faiss"],
+    "src.generator": ["langchain_openai", "langchain_groq"],
+    "src.rag_pipeline": ["redis", "duckduckgo_search", "msgpack"],
+    "src.shared_pipeline": ["streamlit", "langchain_openai", "langchain_community", "faiss", "redis"]
+}
+
+IMPORT_PROBE = (
+    "import json, sys, time; t = time.perf_counter(); import {module}; "
+    "print(json.dumps({{'seconds': time.perf_counter() - t, 'modules': list(sys.modules)}}))"
+)
+
+# Allowed absolute drop in recall@k against the baseline
+RECALL_TOLERANCE = 0.01
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def summarize(values):
+    """Latency summary in seconds"""
+    values = np.asarray(values, dtype=np.float64)
+    return {
+        "mean": float(values.mean()),
+        "p50": float(np.quantile(values, 0.5)),
+        "p95": float(np.quantile(values, 0.95)),
+        "p99": float(np.quantile(values, 0.99))
+    }
+
+
+def make_questions(chunks, count, seed):
+    """Questions built from the first words of random chunks"""
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(chunks).page_content.split()[:8])
+        for _ in range(count)
+    ]
+
+
+def bench_imports(runs=3):
+    """Cold import time per entry point (fresh interpreter) + lazy-import check"""
+    results = {}
+    for module, forbidden in LAZY_IMPORTS.items():
+        times, loaded = [], set()
+        for _ in range(runs):
+            output = subprocess.run(
+                [sys.executable, "-c", IMPORT_PROBE.format(module=module)],
+                cwd=REPO_ROOT,
+                capture_output=True,
+                text=True,
+                check=True
+            ).stdout.strip().splitlines()[-1]
+            probe = json.loads(output)
+            times.append(probe["seconds"])
+            loaded.update(probe["modules"])
+
+        results[module] = {
+            "import_latency_s": summarize(times),
+            "eager_heavy_modules": sorted(m for m in forbidden if m in loaded)
+        }
+    return results
+
+
+def bench_ingestion(pdf_paths, args, workdir):
+    """Parse + chunk the PDFs, then embed and build the index"""
+    processor = DocumentProcessor(chunk_size=Config.CHUNK_SIZE, chunk_overlap=Config.CHUNK_OVERLAP)
+
+    start = time.perf_counter()
+    chunks = processor.process_pdfs(pdf_paths)
+    parse_time = time.perf_counter() - start
+    pages = len({(c.metadata.get("source"), c.metadata.get("page")) for c in chunks})
+    parsed_chunks = len(chunks)
+
+    # Grow the corpus to test retrieval at larger sizes
+    if args.scale > 1:
+        chunks = [
+            Document(page_content=f"{c.page_content} #{copy}", metadata={**c.metadata, "copy": copy})
+            for copy in range(args.scale)
+            for c in chunks
+        ]
+
+    retriever = Retriever(
+        top_k=Config.TOP_K,
+        vector_store_path=os.path.join(workdir, "index"),
+        embeddings=HashingEmbeddings(size=args.dim),
+        precision=args.precision
+    )
+    start = time.perf_counter()
+    retriever.create_vector_store(chunks)
+    index_time = time.perf_counter() - start
+
+    result = {
+        "pages": pages,
+        "chunks": parsed_chunks,
+        "indexed_chunks": len(chunks),
+        "parse_s": parse_time,
+        "pages_per_s": pages / parse_time,
+        "chunks_per_s": parsed_chunks / parse_time,
+        "index_s": index_time,
+        "index_chunks_per_s": len(chunks) / index_time
+    }
+    return result, retriever, chunks
+
+
+def bench_retrieval(retriever, questions):
+    """Single-query latency and batched throughput"""
+    latencies = []
+    for q in questions:
+        start = time.perf_counter()
+        retriever.retrieve(q)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    retriever.retrieve_batch(questions)
+    batch_time = time.perf_counter() - start
+
+    return {
+        "queries": len(questions),
+        "latency_s": summarize(latencies),
+        "single_queries_per_s": len(questions) / sum(latencies),
+        "batch_queries_per_s": len(questions) / batch_time
+    }
+
+
+def bench_storage(retriever, questions):
+    """Vector memory, recall@k and search latency for the index precision"""
+    store = retriever.db
+    vectors = np.asarray(retriever.embed_queries(questions), dtype=np.float32)
+
+    latencies = []
+    for v in vectors:
+        start = time.perf_counter()
+        store.search_batch(v[None], retriever.top_k)
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        **store.memory_report(),
+        "recall_at_k": store.recall_at_k(vectors, retriever.top_k),
+        "recall_at_k_no_rescore": store.recall_at_k(vectors, retriever.top_k, rescore=False),
+        "search_latency_s": summarize(latencies)
+    }
+
+
+def bench_end_to_end(retriever, questions, args):
+    """RAGPipeline.query latency at several concurrency levels (no cache)"""
+    results = {}
+    for concurrency in args.concurrency:
+        registry = MetricsRegistry()
+        pipeline = RAGPipeline(
+            retriever,
+            Generator(llm=FakeChatModel(latency=args.llm_latency)),
+            enable_cache=False,
+            enable_web_search=False,
+            metrics=registry
+        )
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            answers = list(executor.map(pipeline.query, questions))
+        wall = time.perf_counter() - start
+
+        results[str(concurrency)] = {
+            "latency_s": summarize([a["latency"] for a in answers]),
+            "queries_per_s": len(questions) / wall,
+            "stages": {
+                stage: {k: stats[k] for k in ("p50", "p95", "p99")}
+                for stage, stats in registry.snapshot()["stages"].items()
+            }
+        }
+    return results
+
+
+def bench_cache(retriever, questions, args):
+    """Hit rate and hit/miss latency for a skewed (Zipf-like) workload"""
+    pipeline = RAGPipeline(
+        retriever,
+        Generator(llm=FakeChatModel(latency=args.llm_latency)),
+        enable_cache=True,
+        enable_web_search=False,
+        metrics=MetricsRegistry(),
+        cache=InMemoryCache()
+    )
+
+    rng = random.Random(args.seed)
+    weights = [1 / (rank + 1) for rank in range(len(questions))]
+    workload = rng.choices(questions, weights=weights, k=args.cache_queries)
+
+    hits, misses = [], []
+    for q in workload:
+        result = pipeline.query(q)
+        (hits if result["cached"] else misses).append(result["latency"])
+
+    return {
+        "queries": len(workload),
+        "hit_rate": len(hits) / len(workload),
+        "hit_latency_s": summarize(hits) if hits else None,
+        "miss_latency_s": summarize(misses) if misses else None
+    }
+
+
+def flatten(data, prefix=""):
+    """{"a": {"b": 1}} → {"a.b": 1}"""
+    flat = {}
+    for key, value in data.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, path + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def find_regressions(current, baseline, tolerance):
+    """
+    Latency p50/p95 up or throughput (*_per_s) down by more than tolerance,
+    recall down by more than RECALL_TOLERANCE, or more vector memory
+    """
+    regressions = []
+    now, before = flatten(current["results"]), flatten(baseline["results"])
+    for path, old in before.items():
+        new = now.get(path)
+        if new is None or old == 0:
+            continue
+        if "latency" in path and path.endswith((".p50", ".p95")) and new > old * (1 + tolerance):
+            regressions.append(f"{path}: {old:.6f}s → {new:.6f}s")
+        elif path.endswith("_per_s") and new < old * (1 - tolerance):
+            regressions.append(f"{path}: {old:.1f}/s → {new:.1f}/s")
+        elif ".recall_at_k" in path and new < old - RECALL_TOLERANCE:
+            regressions.append(f"{path}: {old:.3f} → {new:.3f}")
+        elif path.endswith(".memory_ratio") and new > old:
+            regressions.append(f"{path}: {old:.3f} → {new:.3f}")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline performance benchmarks")
+    parser.add_argument("--output", default="bench_results.json", help="JSON results file")
+    parser.add_argument("--baseline", help="Previous results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--queries", type=int, default=100, help="Questions per retrieval/end-to-end run")
+    parser.add_argument("--cache-queries", type=int, default=500, help="Queries in the cache workload")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Fake LLM seconds per call")
+    parser.add_argument("--dim", type=int, default=1536, help="Embedding dimensions")
+    parser.add_argument("--scale", type=int, default=1, help="Replicate the corpus N times")
+    parser.add_argument("--precision", default="float32", choices=["float32", "float16", "int8"])
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    pdf_paths = Config.get_pdf_paths()
+    missing = [p for p in pdf_paths if not os.path.exists(p)]
+    if missing:
+        print(f"❌ PDF files not found: {missing}")
+        return 2
+
+    print("⏱️  Imports...")
+    imports = bench_imports()
+
+    workdir = tempfile.mkdtemp(prefix="rag_bench_")
+    try:
+        print("⏱️  Ingestion...")
+        ingestion, retriever, chunks = bench_ingestion(pdf_paths, args, workdir)
+        questions = make_questions(chunks, args.queries, args.seed)
+
+        print("⏱️  Retrieval...")
+        retrieval = bench_retrieval(retriever, questions)
+
+        print("⏱️  Storage...")
+        storage = bench_storage(retriever, questions)
+
+        print("⏱️  End-to-end...")
+        end_to_end = bench_end_to_end(retriever, questions, args)
+
+        print("⏱️  Cache...")
+        cache = bench_cache(retriever, questions, args)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args)
+        },
+        "results": {
+            "imports": imports,
+            "ingestion": ingestion,
+            "retrieval": retrieval,
+            "storage": storage,
+            "end_to_end": end_to_end,
+            "cache": cache
+        }
+    }
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"✅ Results saved to {args.output}")
+
+    eager = {m: r["eager_heavy_modules"] for m, r in imports.items() if r["eager_heavy_modules"]}
+    if eager:
+        print("❌ Heavy modules imported eagerly:")
+        for module, heavy in eager.items():
+            print(f"   {module}: {', '.join(heavy)}")
+        return 1
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = find_regressions(report, baseline, args.tolerance)
+        if regressions:
+            print("❌ Performance regressions:")
+            for line in regressions:
+                print(f"   {line}")
+            return 1
+        print("✅ No regressions against baseline")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
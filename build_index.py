@@ -0,0 +1,73 @@
+"""
+Build the vector index offline (outside the web app)
+Run: python build_index.py [--batch-size 100] [--fresh]
+
+Embedded batches are checkpointed, so an interrupted build resumes where
+it stopped. The finished index is published atomically; running apps and
+API workers pick it up on their next request.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import time
+
+from src.config import Config
+from src.document_processor import DocumentProcessor
+from src.indexer import build_index_from_chunks
+from src.retriever import Retriever
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the vector index from the policy PDFs")
+    parser.add_argument("--batch-size", type=int, default=100, help="Chunks per embeddings request / checkpoint")
+    parser.add_argument("--fresh", action="store_true", help="Ignore checkpoints from an interrupted build")
+    parser.add_argument("--no-progress", action="store_true", help="Disable the progress bar")
+    args = parser.parse_args(argv)
+
+    if Config.VECTOR_STORE_FORMAT not in ("mmap", "faiss"):
+        print(f"❌ Unknown VECTOR_STORE_FORMAT '{Config.VECTOR_STORE_FORMAT}'. Use 'mmap' or 'faiss'.")
+        return 2
+
+    Config.setup()
+
+    pdf_paths = Config.get_pdf_paths()
+    missing = [p for p in pdf_paths if not os.path.exists(p)]
+    if missing:
+        print(f"❌ PDF files not found: {missing}")
+        return 2
+
+    if args.fresh:
+        shutil.rmtree(f"{os.path.normpath(Config.VECTOR_STORE_PATH)}.checkpoint", ignore_errors=True)
+
+    start = time.time()
+    print(f"📄 Processing {len(pdf_paths)} PDF files...")
+    processor = DocumentProcessor(
+        chunk_size=Config.CHUNK_SIZE,
+        chunk_overlap=Config.CHUNK_OVERLAP
+    )
+    chunks = processor.process_pdfs(pdf_paths)
+    print(f"✅ {len(chunks)} chunks")
+
+    # Only used for its embeddings client
+    retriever = Retriever(embedding_model=Config.EMBEDDING_MODEL)
+
+    build_dir = build_index_from_chunks(
+        chunks,
+        retriever.embeddings,
+        Config.VECTOR_STORE_PATH,
+        embedding_model=Config.EMBEDDING_MODEL,
+        batch_size=args.batch_size,
+        precision=Config.VECTOR_PRECISION,
+        compress_text=Config.COMPRESS_CHUNK_TEXT,
+        progress=not args.no_progress,
+        storage=Config.VECTOR_STORE_FORMAT
+    )
+
+    print(f"✅ Published {build_dir} → {Config.VECTOR_STORE_PATH} in {time.time() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
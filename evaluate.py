@@ -10,65 +10,13 @@ from src.config import Config
 from src.retriever import Retriever
 from src.generator import Generator
 from src.rag_pipeline import RAGPipeline
+from src.questions import EVAL_QUESTIONS as QUESTIONS
 from datasets import Dataset
 import numpy as np
 from langchain_openai import ChatOpenAI
 from ragas import evaluate
 
 
-# 12 evaluation questions
-QUESTIONS = [
-    {
-        "question": "ما هو الغرض من سياسة الاستقطاب والتوظيف؟",
-        "ground_truth": "تحديد أساس استقطاب وتوظيف الأشخاص وضمان تكافؤ الفرص على أساس الجدارة والمؤهلات"
-    },
-    {
-        "question": "كم مدة فترة الاختبار؟",
-        "ground_truth": "90 يوماً من تاريخ توقيع عقد العمل"
-    },
-    {
-        "question": "كم مدة الإجازة السنوية؟",
-        "ground_truth": "33 يوماً مدفوعة الأجر مع تذكرة سفر"
-    },
-    {
-        "question": "ما عواقب عدم الالتزام بقواعد السلوك؟",
-        "ground_truth": "إجراءات تأديبية تشمل التوبيخ أو تعليق العمل أو خفض المرتبة أو إنهاء الخدمة"
-    },
-    {
-        "question": "ما الغرض من سياسة الصحة والسلامة؟",
-        "ground_truth": "الحفاظ على أفضل ظروف عمل وضمان شعور الموظفين بالأمان"
-    },
-    {
-        "question": "ما الهدف من سياسة تعارض المصالح؟",
-        "ground_truth": "حماية النزاهة ومنع تأثير المصالح الشخصية على أداء العاملين"
-    },
-    {
-        "question": "ما الهدف من سياسة المحاسبة المالية؟",
-        "ground_truth": "تحديد قواعد مسك الدفاتر وتنظيم القيود المحاسبية والموازنات"
-    },
-    {
-        "question": "ما ضوابط سياسة الاستثمار الآمن؟",
-        "ground_truth": "تشكيل لجنة استثمار ومشروعية الاستثمار والتخطيط المحكم والابتعاد عن المخاطر العالية"
-    },
-    {
-        "question": "ما هي الموارد المالية للمركز؟",
-        "ground_truth": "رسوم العضوية والتبرعات والإعانات الحكومية وعائدات الاستثمار"
-    },
-    {
-        "question": "هل توجد إجازة طارئة؟",
-        "ground_truth": "نعم، يحق للموظف الحصول على إجازة طارئة في حالات معينة"
-    },
-    {
-        "question": "ما سياسة الإبلاغ عن المخالفات؟",
-        "ground_truth": "توفير قنوات للإبلاغ مع حماية المبلغين من الانتقام"
-    },
-    {
-        "question": "كيف يتعامل المركز مع غسل الأموال؟",
-        "ground_truth": "إجراءات وقائية تشمل تقييم المخاطر والقنوات غير النقدية والتدريب"
-    }
-]
-
-
 
 
 def run_evaluation():
@@ -78,11 +26,14 @@ def run_evaluation():
     retriever = Retriever(
         embedding_model=Config.EMBEDDING_MODEL,
         top_k=Config.TOP_K,
-        vector_store_path=Config.VECTOR_STORE_PATH
+        vector_store_path=Config.VECTOR_STORE_PATH,
+        storage=Config.VECTOR_STORE_FORMAT,
+        precision=Config.VECTOR_PRECISION,
+        compress_text=Config.COMPRESS_CHUNK_TEXT
     )
 
     if not retriever.load_vector_store():
-        raise RuntimeError("Vector store not found. Run the app first.")
+        raise RuntimeError("Vector store not found. Run: python build_index.py")
 
     generator = Generator(
         model=Config.LLM_MODEL,
@@ -0,0 +1,54 @@
+"""
+Cache Codec - compact binary cache entries (msgpack + zlib)
+
+An entry keeps the answer and the IDs of the retrieved chunks, not their
+text; the text is read back from the local docstore on a hit.
+"""
+
+import zlib
+
+
+FORMAT_VERSION = 1
+
+# Every entry has these, plus a list under "chunk_ids" or "contexts"
+REQUIRED_KEYS = ("question", "answer", "web_search_used")
+
+
+def encode_entry(result, docs):
+    """Result dict + retrieved docs → bytes for the cache"""
+    import msgpack
+
+    entry = {
+        "v": FORMAT_VERSION,
+        "question": result["question"],
+        "answer": result["answer"],
+        "web_search_used": result["web_search_used"]
+    }
+    chunk_ids = [d.id for d in docs]
+    if all(chunk_ids):
+        entry["chunk_ids"] = chunk_ids
+    else:
+        # Documents without a stable ID: keep the text itself
+        entry["contexts"] = [d.page_content for d in docs]
+
+    return zlib.compress(msgpack.packb(entry, use_bin_type=True))
+
+
+def decode_entry(blob):
+    """Bytes from the cache → entry dict, or None if unreadable / other format"""
+    import msgpack
+
+    if isinstance(blob, str):
+        # Written by an older version as JSON text
+        return None
+    try:
+        entry = msgpack.unpackb(zlib.decompress(blob), raw=False)
+    except (zlib.error, ValueError, msgpack.UnpackException):
+        return None
+    if not isinstance(entry, dict) or entry.get("v") != FORMAT_VERSION:
+        return None
+    if not all(key in entry for key in REQUIRED_KEYS):
+        return None
+    if not isinstance(entry.get("chunk_ids", entry.get("contexts")), list):
+        return None
+    return entry
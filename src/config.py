@@ -3,23 +3,32 @@ Configuration
 """
 
 import os
+import sys
 from dotenv import load_dotenv
 
-import streamlit as st
-
 load_dotenv()
 
 
+def _secret(name):
+    """
+    Streamlit secret if running inside Streamlit, else environment variable.
+    Streamlit is never imported here, so CLI tools and workers don't pay for it.
+    """
+    st = sys.modules.get("streamlit")
+    if st is not None:
+        try:
+            return st.secrets[name]
+        except Exception:
+            pass
+    return os.getenv(name)
+
+
 class Config:
     # API Keys
     # Get API keys (من .env محلياً أو من Streamlit secrets)
-    try:
-        OPENAI_API_KEY = st.secrets["OPENAI_API_KEY"]
-        GROQ_API_KEY = st.secrets["GROQ_API_KEY"]
-        TAVILY_API_KEY = st.secrets["TAVILY_API_KEY"]
-    except:
-        OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-        GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+    OPENAI_API_KEY = _secret("OPENAI_API_KEY")
+    GROQ_API_KEY = _secret("GROQ_API_KEY")
+    TAVILY_API_KEY = _secret("TAVILY_API_KEY")
         
     
     # LLM Provider Settings 
@@ -30,6 +39,14 @@ class Config:
     LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")  # Can be overridden in .env
     LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0"))
     
+    # Hedged generation: race this provider when the primary is slow or fails (unset = off)
+    LLM_FALLBACK_PROVIDER = os.getenv("LLM_FALLBACK_PROVIDER")  # "openai" or "groq"
+    LLM_FALLBACK_MODEL = os.getenv("LLM_FALLBACK_MODEL") or (  # Default follows the provider
+        "llama-3.3-70b-versatile" if LLM_FALLBACK_PROVIDER == "groq" else "gpt-4o-mini"
+    )
+    HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "0.3"))  # Seconds; the delay follows
+    HEDGE_MAX_DELAY = float(os.getenv("HEDGE_MAX_DELAY", "4.0"))  # the primary's p95 first token
+    
     # Retrieval Settings
     CHUNK_SIZE = 900
     CHUNK_OVERLAP = 150
@@ -39,6 +56,13 @@ class Config:
     PDF_FOLDER = "data/pdfs"
     VECTOR_STORE_PATH = "data/vector_store"
     
+    # Vector store format: "mmap" (memory-mapped, no pickle) or "faiss" (legacy)
+    VECTOR_STORE_FORMAT = os.getenv("VECTOR_STORE_FORMAT", "mmap")
+    
+    # Compact mmap storage: "float32", "float16" or "int8" (+ exact re-scoring)
+    VECTOR_PRECISION = os.getenv("VECTOR_PRECISION", "float32")
+    COMPRESS_CHUNK_TEXT = os.getenv("COMPRESS_CHUNK_TEXT", "false").lower() == "true"
+    
     # PDF Files
     PDF_FILES = [
         "KSSC_General_Policies.pdf",
@@ -52,6 +76,32 @@ class Config:
     
     # Cache
     ENABLE_CACHE = True
+    CACHE_TTL = int(os.getenv("CACHE_TTL", "3600"))  # Seconds an answer stays cached
+    # Coalesce identical questions across processes with a Redis lock (in-process is always on)
+    COALESCE_ACROSS_PROCESSES = os.getenv("COALESCE_ACROSS_PROCESSES", "false").lower() == "true"
+    COALESCE_LEASE = float(os.getenv("COALESCE_LEASE", "60"))  # Seconds before a held lock expires
+    
+    # Cache warm-up: keep hot questions cached (QUICK_QUESTIONS + EVAL_QUESTIONS,
+    # WARMUP_QUESTIONS_FILE lines and the WARMUP_TOP_N most asked in METRICS_JSONL_PATH)
+    ENABLE_WARMUP = os.getenv("ENABLE_WARMUP", "false").lower() == "true"
+    WARMUP_QUESTIONS_FILE = os.getenv("WARMUP_QUESTIONS_FILE")             # One question per line
+    WARMUP_TOP_N = int(os.getenv("WARMUP_TOP_N", "20"))
+    WARMUP_INTERVAL = float(os.getenv("WARMUP_INTERVAL", "300"))            # Seconds between passes
+    WARMUP_REFRESH_BEFORE = float(os.getenv("WARMUP_REFRESH_BEFORE", "900"))  # Refresh when TTL left < this
+    WARMUP_WORKERS = int(os.getenv("WARMUP_WORKERS", "2"))                  # Parallel refreshes
+    
+    # HTTP API (api.py)
+    API_MAX_WORKERS = int(os.getenv("API_MAX_WORKERS", "8"))        # Threads running pipeline calls
+    API_MAX_PENDING = int(os.getenv("API_MAX_PENDING", "32"))       # Running + waiting requests before 503
+    API_REQUEST_TIMEOUT = float(os.getenv("API_REQUEST_TIMEOUT", "60"))  # Seconds
+    API_MAX_BATCH = int(os.getenv("API_MAX_BATCH", "32"))           # Questions per batch request
+    API_BATCH_WORKERS = int(os.getenv("API_BATCH_WORKERS", "4"))    # Parallel LLM calls per batch
+    
+    # Metrics: append one JSON line per query to this file (unset = off)
+    METRICS_JSONL_PATH = os.getenv("METRICS_JSONL_PATH")
+    
+    # Streamlit as a thin client: query this API instead of a local pipeline
+    API_URL = os.getenv("API_URL")
     
     @classmethod
     def get_pdf_paths(cls):
@@ -81,4 +131,12 @@ class Config:
         
         else:
             print(f"⚠️  Warning: Unknown LLM_PROVIDER '{cls.LLM_PROVIDER}'. Using OpenAI.")
-            cls.LLM_PROVIDER = "openai"
\ No newline at end of file
+            cls.LLM_PROVIDER = "openai"
+        
+        # Check fallback provider
+        if cls.LLM_FALLBACK_PROVIDER == "groq":
+            if not cls.GROQ_API_KEY:
+                print("⚠️  Warning: GROQ_API_KEY not found. Hedged generation disabled.")
+                cls.LLM_FALLBACK_PROVIDER = None
+            else:
+                os.environ["GROQ_API_KEY"] = cls.GROQ_API_KEY
\ No newline at end of file
@@ -2,7 +2,6 @@
 Document Processing Module - 
 """
 
-from langchain_community.document_loaders import PyPDFLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 import re
 
@@ -19,6 +18,9 @@ class DocumentProcessor:
     
     def process_pdfs(self, pdf_paths):
         """Load PDFs → Clean → Chunk"""
+        # langchain_community is heavy: import on first use
+        from langchain_community.document_loaders import PyPDFLoader
+        
         # Load all PDFs
         all_docs = []
         for pdf_path in pdf_paths:
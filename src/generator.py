@@ -2,7 +2,6 @@
 Generator Module - Multi-LLM Support 
 """
 
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 
@@ -10,7 +9,7 @@ from langchain_core.output_parsers import StrOutputParser
 class Generator:
     """Generate answers using GPT or Groq"""
     
-    def __init__(self, model="gpt-4o-mini", temperature=0, provider=None):
+    def __init__(self, model="gpt-4o-mini", temperature=0, provider=None, llm=None):
         """
         Initialize generator
         
@@ -18,12 +17,15 @@ class Generator:
             model: Model name (e.g., "gpt-4o-mini" or "llama-3.3-70b-versatile")
             temperature: Model temperature (0-1)
             provider: "openai" or "groq" (auto-detected if None)
+            llm: ready-made LangChain chat model (skips provider setup, e.g. a fake for benchmarks)
         """
         self.model = model
         self.temperature = temperature
         
         # Auto-detect provider if not specified
-        if provider is None:
+        if llm is not None:
+            provider = provider or "custom"
+        elif provider is None:
             if "gpt" in model.lower():
                 provider = "openai"
             elif "llama" in model.lower() in model.lower():
@@ -34,8 +36,13 @@ class Generator:
         self.provider = provider.lower()
         
         # Initialize LLM based on provider
-        if self.provider == "openai":
-            self.llm = ChatOpenAI(model=model, temperature=temperature)
+        if llm is not None:
+            self.llm = llm
+        
+        elif self.provider == "openai":
+            # stream_usage: streamed calls (stream(), hedging) report tokens too
+            from langchain_openai import ChatOpenAI
+            self.llm = ChatOpenAI(model=model, temperature=temperature, stream_usage=True)
             print(f"✅ Using OpenAI: {model}")
             
         elif self.provider == "groq":
@@ -45,13 +52,15 @@ class Generator:
                 print(f"✅ Using Groq: {model}")
             except ImportError:
                 print("⚠️  Warning: langchain-groq not installed. Falling back to OpenAI.")
-                self.llm = ChatOpenAI(model="gpt-4o-mini", temperature=temperature)
+                from langchain_openai import ChatOpenAI
+                self.llm = ChatOpenAI(model="gpt-4o-mini", temperature=temperature, stream_usage=True)
                 self.provider = "openai"
         
         else:
             # Fallback to OpenAI
             print(f"⚠️  Warning: Unknown provider '{self.provider}'. Using OpenAI.")
-            self.llm = ChatOpenAI(model=model, temperature=temperature)
+            from langchain_openai import ChatOpenAI
+            self.llm = ChatOpenAI(model=model, temperature=temperature, stream_usage=True)
             self.provider = "openai"
         
         self.prompt = ChatPromptTemplate.from_template("""
@@ -74,7 +83,33 @@ class Generator:
 الإجابة:
 """)
     
-    def generate(self, question, context):
-        """Generate answer from question and context"""
-        chain = self.prompt | self.llm | StrOutputParser()
-        return chain.invoke({"question": question, "context": context})
\ No newline at end of file
+    @staticmethod
+    def _add_usage(usage, message):
+        """Add the message's token counts to a usage dict (if the provider reports them)"""
+        if usage is None:
+            return
+        metadata = getattr(message, "usage_metadata", None) or {}
+        usage["input"] = usage.get("input", 0) + metadata.get("input_tokens", 0)
+        usage["output"] = usage.get("output", 0) + metadata.get("output_tokens", 0)
+    
+    def generate(self, question, context, usage=None):
+        """
+        Generate answer from question and context
+        
+        Args:
+            usage: optional dict; input/output token counts are added to it
+        """
+        chain = self.prompt | self.llm
+        message = chain.invoke({"question": question, "context": context})
+        self._add_usage(usage, message)
+        return StrOutputParser().invoke(message)
+    
+    def stream(self, question, context, usage=None):
+        """Generate answer as a stream of text chunks"""
+        chain = self.prompt | self.llm
+        parser = StrOutputParser()
+        for chunk in chain.stream({"question": question, "context": context}):
+            self._add_usage(usage, chunk)
+            text = parser.invoke(chunk)
+            if text:
+                yield text
\ No newline at end of file
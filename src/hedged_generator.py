@@ -0,0 +1,255 @@
+"""
+Hedged Generator - race a secondary provider against a slow or failing primary
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from src.metrics import QUANTILES
+
+
+class ProviderStats:
+    """Per-provider request/error counters and latency windows"""
+
+    def __init__(self, name, window=200):
+        self.name = name
+        self._lock = threading.Lock()
+        self._first_token = deque(maxlen=window)
+        self._total = deque(maxlen=window)
+        self.requests = 0
+        self.errors = 0
+        self.wins = 0
+        self.hedges = 0      # Times this provider was started as a hedge/fallback
+        self.cancelled = 0
+
+    def count(self, field):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def observe_first_token(self, seconds):
+        with self._lock:
+            self._first_token.append(seconds)
+
+    def observe_total(self, seconds):
+        with self._lock:
+            self._total.append(seconds)
+
+    def first_token_quantile(self, q, min_samples):
+        """q-quantile of time to first token, or None with too few samples"""
+        with self._lock:
+            if len(self._first_token) < min_samples:
+                return None
+            return float(np.quantile(np.fromiter(self._first_token, dtype=np.float64), q))
+
+    def snapshot(self):
+        with self._lock:
+            snap = {
+                "requests": self.requests,
+                "errors": self.errors,
+                "wins": self.wins,
+                "hedges": self.hedges,
+                "cancelled": self.cancelled
+            }
+            for kind, samples in (("first_token", self._first_token), ("total", self._total)):
+                values = np.fromiter(samples, dtype=np.float64)
+                snap[kind] = {
+                    f"p{int(q * 100)}": float(np.quantile(values, q)) if len(values) else None
+                    for q in QUANTILES
+                }
+            return snap
+
+
+class HedgedGenerator:
+    """
+    Drop-in replacement for Generator that spreads a call over several
+    Generators (primary first):
+
+    - the primary is started; if it sends no first token within the hedge
+      delay, the next provider is started too (hedge)
+    - a provider that fails starts the next one right away (fallback)
+    - generate() keeps whichever answer finishes first, stream() the
+      provider that sends a token first; the others are cancelled
+
+    The hedge delay is the primary's observed p95 time to first token,
+    clamped to [min_delay, max_delay] (max_delay until there are
+    `min_samples` observations). Cancelling is cooperative: an attempt
+    stops at its next chunk.
+    """
+
+    def __init__(self, generators, min_delay=0.3, max_delay=4.0, quantile=0.95, min_samples=10):
+        if not generators:
+            raise ValueError("HedgedGenerator needs at least one generator")
+        self.generators = list(generators)
+        self.names = self._unique_names(self.generators)
+        self.stats = {name: ProviderStats(name) for name in self.names}
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.quantile = quantile
+        self.min_samples = min_samples
+
+    @staticmethod
+    def _unique_names(generators):
+        names = []
+        for g in generators:
+            name = f"{g.provider}:{g.model}"
+            names.append(name if name not in names else f"{name}#{len(names)}")
+        return names
+
+    @property
+    def provider(self):
+        return self.generators[0].provider
+
+    @property
+    def model(self):
+        return self.generators[0].model
+
+    def hedge_delay(self):
+        """Seconds to wait for the primary's first token before hedging"""
+        observed = self.stats[self.names[0]].first_token_quantile(self.quantile, self.min_samples)
+        if observed is None:
+            return self.max_delay
+        return min(self.max_delay, max(self.min_delay, observed))
+
+    def _attempt(self, index, question, context, events, cancel):
+        """Stream one provider's answer into `events` until done or cancelled"""
+        stats = self.stats[self.names[index]]
+        stats.count("requests")
+        usage = {"input": 0, "output": 0}
+        parts = []
+        first = None
+        start = time.perf_counter()
+        chunks = self.generators[index].stream(question, context, usage=usage)
+
+        try:
+            for text in chunks:
+                if cancel.is_set():
+                    break
+                if first is None:
+                    first = time.perf_counter() - start
+                    stats.observe_first_token(first)
+                    events.put(("first", index, None))
+                parts.append(text)
+                events.put(("token", index, text))
+
+            if cancel.is_set():
+                stats.count("cancelled")
+                # Only a lower bound, but keeps slow providers from looking fast
+                if first is None:
+                    stats.observe_first_token(time.perf_counter() - start)
+                return
+
+            stats.observe_total(time.perf_counter() - start)
+            events.put(("done", index, ("".join(parts), usage)))
+        except Exception as e:
+            stats.count("errors")
+            events.put(("error", index, e))
+        finally:
+            chunks.close()
+
+    def _race(self, question, context, streaming):
+        """
+        Run providers as described in the class docstring. Yields the
+        winner's tokens when `streaming`; returns (answer, usage).
+        """
+        events = queue.Queue()
+        cancels = {}
+        running = set()
+        winner = None
+        first_seen = False
+        last_error = None
+
+        def launch(index):
+            cancels[index] = threading.Event()
+            running.add(index)
+            threading.Thread(
+                target=self._attempt,
+                args=(index, question, context, events, cancels[index]),
+                name=f"hedge-{self.names[index]}",
+                daemon=True
+            ).start()
+
+        launch(0)
+        next_index = 1
+        deadline = time.monotonic() + self.hedge_delay()
+
+        try:
+            while running:
+                hedging = not first_seen and next_index < len(self.generators)
+                try:
+                    timeout = max(0.0, deadline - time.monotonic()) if hedging else None
+                    kind, index, payload = events.get(timeout=timeout)
+                except queue.Empty:
+                    # No first token in time → start the next provider as a hedge
+                    self.stats[self.names[next_index]].count("hedges")
+                    launch(next_index)
+                    next_index += 1
+                    deadline = time.monotonic() + self.hedge_delay()
+                    continue
+
+                if winner is not None and index != winner:
+                    continue
+
+                if kind == "first":
+                    first_seen = True
+                    if streaming:
+                        winner = index
+                        for other in running - {winner}:
+                            cancels[other].set()
+
+                elif kind == "token":
+                    if streaming:
+                        yield payload
+
+                elif kind == "done":
+                    self.stats[self.names[index]].count("wins")
+                    return payload
+
+                elif kind == "error":
+                    running.discard(index)
+                    last_error = payload
+                    if index == winner:
+                        raise payload
+                    # Fall back right away if nothing else is running
+                    if not running and next_index < len(self.generators):
+                        self.stats[self.names[next_index]].count("hedges")
+                        launch(next_index)
+                        next_index += 1
+                        deadline = time.monotonic() + self.hedge_delay()
+
+            raise last_error
+        finally:
+            # Stop losers (and everything, if the caller stopped reading)
+            for cancel in cancels.values():
+                cancel.set()
+
+    @staticmethod
+    def _merge_usage(usage, attempt_usage):
+        if usage is None:
+            return
+        for kind, value in attempt_usage.items():
+            usage[kind] = usage.get(kind, 0) + value
+
+    def generate(self, question, context, usage=None):
+        """Answer from the first provider to finish"""
+        race = self._race(question, context, streaming=False)
+        while True:
+            try:
+                next(race)
+            except StopIteration as done:
+                answer, attempt_usage = done.value
+                break
+        self._merge_usage(usage, attempt_usage)
+        return answer
+
+    def stream(self, question, context, usage=None):
+        """Stream from the first provider to send a token"""
+        answer, attempt_usage = yield from self._race(question, context, streaming=True)
+        self._merge_usage(usage, attempt_usage)
+
+    def provider_stats(self):
+        """{provider name: snapshot} for every provider"""
+        return {name: stats.snapshot() for name, stats in self.stats.items()}
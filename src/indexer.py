@@ -0,0 +1,150 @@
+"""
+Index Builder - resumable embedding + atomic publish
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+from tqdm import tqdm
+
+from src.mmap_store import MmapVectorStore
+
+
+MANIFEST_FILE = "manifest.json"
+
+
+def chunks_fingerprint(chunks, embedding_model):
+    """Hash of chunk texts + model: checkpoints are only reused if it matches"""
+    digest = hashlib.sha256(embedding_model.encode("utf-8"))
+    for chunk in chunks:
+        digest.update(b"\0")
+        digest.update(chunk.page_content.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _batch_file(checkpoint_dir, index):
+    return os.path.join(checkpoint_dir, f"batch_{index:05d}.npy")
+
+
+def embed_with_checkpoints(chunks, embeddings, checkpoint_dir, fingerprint, batch_size=100, progress=True):
+    """
+    Embed chunks batch by batch, saving each batch to `checkpoint_dir`.
+    Batches already saved by an interrupted run with the same fingerprint
+    are loaded instead of embedded again.
+    """
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    manifest_path = os.path.join(checkpoint_dir, MANIFEST_FILE)
+    manifest = {"fingerprint": fingerprint, "batch_size": batch_size, "total": len(chunks)}
+
+    # Start over if the checkpoints belong to other chunks/settings
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            if json.load(f) != manifest:
+                shutil.rmtree(checkpoint_dir)
+                os.makedirs(checkpoint_dir)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+
+    num_batches = (len(chunks) + batch_size - 1) // batch_size
+    batches = []
+    resumed = 0
+
+    with tqdm(total=len(chunks), desc="Embedding", unit="chunk", disable=not progress) as bar:
+        for i in range(num_batches):
+            path = _batch_file(checkpoint_dir, i)
+            batch = chunks[i * batch_size:(i + 1) * batch_size]
+
+            if os.path.exists(path):
+                vectors = np.load(path)
+                resumed += 1
+            else:
+                vectors = np.asarray(
+                    embeddings.embed_documents([c.page_content for c in batch]),
+                    dtype=np.float32
+                )
+                # Write then rename: a crash never leaves a half-written batch
+                tmp_path = path + ".tmp.npy"
+                np.save(tmp_path, vectors)
+                os.replace(tmp_path, path)
+
+            batches.append(vectors)
+            bar.update(len(batch))
+
+    if resumed and progress:
+        print(f"↩️  Resumed {resumed}/{num_batches} batches from {checkpoint_dir}")
+
+    return np.concatenate(batches) if batches else np.empty((0, 0), dtype=np.float32)
+
+
+def publish(build_dir, target_path, keep=2):
+    """
+    Make `target_path` point at `build_dir` in one step.
+
+    `target_path` becomes a symlink swapped with os.replace, so readers
+    see either the old or the new index, never a mix. Older builds beyond
+    `keep` are deleted. Without symlink support, falls back to renames.
+    """
+    target_path = os.path.normpath(target_path)
+    builds_dir = os.path.dirname(build_dir)
+
+    try:
+        # A real folder from an older version: move it aside once
+        if os.path.isdir(target_path) and not os.path.islink(target_path):
+            os.replace(target_path, os.path.join(builds_dir, f"legacy-{int(time.time())}"))
+
+        link_tmp = f"{target_path}.link-{os.getpid()}"
+        os.symlink(os.path.relpath(build_dir, os.path.dirname(target_path) or "."), link_tmp)
+        os.replace(link_tmp, target_path)
+    except (OSError, NotImplementedError):
+        old = f"{target_path}.old-{os.getpid()}"
+        if os.path.lexists(target_path):
+            os.replace(target_path, old)
+        os.replace(build_dir, target_path)
+        if os.path.islink(old):
+            os.remove(old)
+        else:
+            shutil.rmtree(old, ignore_errors=True)
+
+    # Keep the newest builds only (the live one is always kept)
+    live = os.path.realpath(target_path)
+    builds = sorted(
+        (os.path.join(builds_dir, name) for name in os.listdir(builds_dir)),
+        key=os.path.getmtime,
+        reverse=True
+    )
+    for old_build in builds[keep:]:
+        if os.path.realpath(old_build) != live:
+            shutil.rmtree(old_build, ignore_errors=True)
+
+
+def build_index_from_chunks(chunks, embeddings, target_path, embedding_model, batch_size=100,
+                            precision="float32", compress_text=False, progress=True, storage="mmap"):
+    """Embed (resumably), write a new mmap (or FAISS) store and publish it atomically"""
+    target_path = os.path.normpath(target_path)
+    checkpoint_dir = f"{target_path}.checkpoint"
+    builds_dir = f"{target_path}.builds"
+
+    fingerprint = chunks_fingerprint(chunks, embedding_model)
+    vectors = embed_with_checkpoints(chunks, embeddings, checkpoint_dir, fingerprint, batch_size, progress)
+
+    os.makedirs(builds_dir, exist_ok=True)
+    build_dir = tempfile.mkdtemp(prefix=time.strftime("%Y%m%d-%H%M%S-"), dir=builds_dir)
+    if storage == "faiss":
+        from langchain_community.vectorstores import FAISS
+        FAISS.from_embeddings(
+            list(zip((c.page_content for c in chunks), vectors.tolist())),
+            embeddings,
+            metadatas=[c.metadata for c in chunks]
+        ).save_local(build_dir)
+    else:
+        store = MmapVectorStore.build(build_dir, vectors, chunks, precision=precision, compress_text=compress_text)
+        store.close()
+
+    publish(build_dir, target_path)
+    shutil.rmtree(checkpoint_dir, ignore_errors=True)
+    return build_dir
@@ -0,0 +1,223 @@
+"""
+Metrics - per-stage timings, token counts and cache hits
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+@contextmanager
+def span(timings, stage):
+    """Add the time spent inside the block to timings[stage] (seconds)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
+
+class MetricsRegistry:
+    """
+    Aggregates query results in memory:
+    - last `window` durations per stage → p50/p95/p99
+    - counters for queries, tokens and cache hits per tier
+    Warm-up refreshes only count as warm-ups (and their tokens), so they
+    do not skew user latency or hit rates.
+    Exporters get every observed record (e.g. JsonlExporter).
+    """
+
+    def __init__(self, window=1000):
+        self.window = window
+        self.exporters = []
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Drop all samples and counters"""
+        with self._lock:
+            self._samples = {}
+            self._counts = {}
+            self._sums = {}
+            self.queries = 0
+            self.tokens = {"input": 0, "output": 0}
+            self.cache_hits = {}
+            self.cache_misses = 0
+            self.warmups = 0
+            self.warmup_tokens = {"input": 0, "output": 0}
+
+    def add_exporter(self, exporter):
+        """Register an object with an export(record) method"""
+        self.exporters.append(exporter)
+
+    def _aggregate(self, timings, tokens, tier):
+        """Add one user query to the windows and counters (lock held)"""
+        self.queries += 1
+        for stage, seconds in timings.items():
+            if stage not in self._samples:
+                self._samples[stage] = deque(maxlen=self.window)
+                self._counts[stage] = 0
+                self._sums[stage] = 0.0
+            self._samples[stage].append(seconds)
+            self._counts[stage] += 1
+            self._sums[stage] += seconds
+        for kind in self.tokens:
+            self.tokens[kind] += tokens.get(kind, 0)
+        if tier:
+            self.cache_hits[tier] = self.cache_hits.get(tier, 0) + 1
+        else:
+            self.cache_misses += 1
+
+    def observe(self, result):
+        """Record one query result (needs 'timings', 'tokens', 'cache_tier')"""
+        timings = result.get("timings", {})
+        tokens = result.get("tokens", {})
+        tier = result.get("cache_tier")
+
+        with self._lock:
+            if result.get("warmup"):
+                self.warmups += 1
+                for kind in self.warmup_tokens:
+                    self.warmup_tokens[kind] += tokens.get(kind, 0)
+            else:
+                self._aggregate(timings, tokens, tier)
+
+        record = {
+            "ts": time.time(),
+            "question": result.get("question"),
+            "cache_tier": tier,
+            "timings": timings,
+            "tokens": tokens,
+            "web_search_used": result.get("web_search_used", False),
+            "warmup": result.get("warmup", False)
+        }
+        for exporter in self.exporters:
+            try:
+                exporter.export(record)
+            except Exception as e:
+                print(f"⚠️ Metrics export failed: {e}")
+
+    def snapshot(self):
+        """Per-stage count/sum/quantiles plus counters, as a dict"""
+        with self._lock:
+            stages = {}
+            for stage, samples in self._samples.items():
+                values = np.fromiter(samples, dtype=np.float64)
+                stages[stage] = {
+                    "count": self._counts[stage],
+                    "sum": self._sums[stage],
+                    **{f"p{int(q * 100)}": float(np.quantile(values, q)) for q in QUANTILES}
+                }
+            return {
+                "queries": self.queries,
+                "stages": stages,
+                "tokens": dict(self.tokens),
+                "cache_hits": dict(self.cache_hits),
+                "cache_misses": self.cache_misses,
+                "warmups": self.warmups,
+                "warmup_tokens": dict(self.warmup_tokens)
+            }
+
+
+def render_prometheus(registry, prefix="rag"):
+    """Prometheus text exposition of a registry snapshot"""
+    snap = registry.snapshot()
+    lines = [
+        f"# HELP {prefix}_stage_seconds Time spent per pipeline stage",
+        f"# TYPE {prefix}_stage_seconds summary"
+    ]
+    for stage, stats in sorted(snap["stages"].items()):
+        for q in QUANTILES:
+            lines.append(
+                f'{prefix}_stage_seconds{{stage="{stage}",quantile="{q}"}} {stats[f"p{int(q * 100)}"]:.6f}'
+            )
+        lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {stats["sum"]:.6f}')
+        lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {stats["count"]}')
+
+    lines += [
+        f"# HELP {prefix}_queries_total Queries answered",
+        f"# TYPE {prefix}_queries_total counter",
+        f"{prefix}_queries_total {snap['queries']}",
+        f"# HELP {prefix}_tokens_total LLM tokens used",
+        f"# TYPE {prefix}_tokens_total counter"
+    ]
+    for kind, count in snap["tokens"].items():
+        lines.append(f'{prefix}_tokens_total{{kind="{kind}"}} {count}')
+
+    lines += [
+        f"# HELP {prefix}_cache_hits_total Answers served from cache, per tier",
+        f"# TYPE {prefix}_cache_hits_total counter"
+    ]
+    for tier, count in sorted(snap["cache_hits"].items()):
+        lines.append(f'{prefix}_cache_hits_total{{tier="{tier}"}} {count}')
+
+    lines += [
+        f"# HELP {prefix}_cache_misses_total Answers computed because no tier had them",
+        f"# TYPE {prefix}_cache_misses_total counter",
+        f"{prefix}_cache_misses_total {snap['cache_misses']}",
+        f"# HELP {prefix}_warmups_total Background warm-up refreshes (not in the query metrics)",
+        f"# TYPE {prefix}_warmups_total counter",
+        f"{prefix}_warmups_total {snap['warmups']}",
+        f"# HELP {prefix}_warmup_tokens_total LLM tokens used by warm-up refreshes",
+        f"# TYPE {prefix}_warmup_tokens_total counter"
+    ]
+    for kind, count in snap["warmup_tokens"].items():
+        lines.append(f'{prefix}_warmup_tokens_total{{kind="{kind}"}} {count}')
+
+    return "\n".join(lines) + "\n"
+
+
+def render_provider_stats(stats, prefix="rag"):
+    """Prometheus text for HedgedGenerator.provider_stats()"""
+    lines = []
+    for counter, help_text in (
+        ("requests", "LLM calls started per provider"),
+        ("errors", "LLM calls that failed per provider"),
+        ("wins", "Answers used per provider"),
+        ("hedges", "Calls started as hedge or fallback per provider"),
+        ("cancelled", "Calls cancelled after another provider won")
+    ):
+        lines += [
+            f"# HELP {prefix}_llm_{counter}_total {help_text}",
+            f"# TYPE {prefix}_llm_{counter}_total counter"
+        ]
+        for name, snap in sorted(stats.items()):
+            lines.append(f'{prefix}_llm_{counter}_total{{provider="{name}"}} {snap[counter]}')
+
+    for kind in ("first_token", "total"):
+        lines += [
+            f"# HELP {prefix}_llm_{kind}_seconds LLM {kind.replace('_', ' ')} latency per provider",
+            f"# TYPE {prefix}_llm_{kind}_seconds summary"
+        ]
+        for name, snap in sorted(stats.items()):
+            for q in QUANTILES:
+                value = snap[kind][f"p{int(q * 100)}"]
+                if value is not None:
+                    lines.append(f'{prefix}_llm_{kind}_seconds{{provider="{name}",quantile="{q}"}} {value}')
+
+    return "\n".join(lines) + "\n"
+
+
+class JsonlExporter:
+    """Append one JSON line per query to a file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, record):
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+# Default registry used by RAGPipeline
+REGISTRY = MetricsRegistry()
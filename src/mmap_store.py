@@ -0,0 +1,407 @@
+"""
+Memory-Mapped Vector Store - no pickle, lazy docstore
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import zlib
+
+import numpy as np
+from langchain_core.documents import Document
+
+
+META_FILE = "meta.json"
+VECTORS_FILE = "vectors.npy"
+NORMS_FILE = "sq_norms.npy"
+DOCSTORE_FILE = "docstore.sqlite"
+
+# Compact copies used for the first search pass
+COMPACT_FILES = {
+    "float16": "vectors.f16.npy",
+    "int8": "vectors.i8.npy"
+}
+SCALES_FILE = "scales.npy"
+
+PRECISIONS = ("float32", "float16", "int8")
+FORMAT_VERSION = 1
+
+# Rows scanned per step by the float32 batched search
+BLOCK_SIZE = 16384
+
+# Compact rows are converted to float32 a block at a time; keeping the block
+# small (~4 MiB) keeps it in cache and bounds per-query temporary memory
+COMPACT_BLOCK_BYTES = 4 * 1024 * 1024
+
+
+def chunk_id_for(content, metadata):
+    """Stable ID for a chunk: same text from the same page → same ID"""
+    key = json.dumps(
+        [metadata.get("source"), metadata.get("page"), content],
+        ensure_ascii=False
+    )
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def quantize_int8(vectors):
+    """Symmetric int8 quantization with one scale per vector"""
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.round(vectors / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+class MmapVectorStore:
+    """
+    Flat L2 index stored as plain files:
+    - vectors.npy is memory-mapped (shared page cache between processes)
+    - chunk text/metadata live in SQLite and are read by row on demand
+    - optional float16/int8 copy is scanned first, then the best
+      candidates are re-scored exactly against vectors.npy
+    """
+
+    # Candidates re-scored exactly = k * RESCORE_FACTOR
+    RESCORE_FACTOR = 4
+
+    def __init__(self, path):
+        self.path = path
+
+        with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+            self.meta = json.load(f)
+
+        self.precision = self.meta.get("precision", "float32")
+        self.vectors = np.load(os.path.join(path, VECTORS_FILE), mmap_mode="r")
+        self.sq_norms = np.load(os.path.join(path, NORMS_FILE), mmap_mode="r")
+
+        self.compact = None
+        self.scales = None
+        if self.precision != "float32":
+            self.compact = np.load(os.path.join(path, COMPACT_FILES[self.precision]), mmap_mode="r")
+        if self.precision == "int8":
+            self.scales = np.load(os.path.join(path, SCALES_FILE), mmap_mode="r")
+
+        # One read-only connection shared by all threads
+        uri = f"file:{os.path.abspath(os.path.join(path, DOCSTORE_FILE))}?mode=ro"
+        self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def exists(path):
+        """Check that the store is complete (meta.json is written last)"""
+        return all(
+            os.path.exists(os.path.join(path, name))
+            for name in (META_FILE, VECTORS_FILE, NORMS_FILE, DOCSTORE_FILE)
+        )
+
+    @classmethod
+    def build(cls, path, vectors, documents, precision="float32", compress_text=False):
+        """
+        Write vectors + documents to `path` and open the result
+
+        Args:
+            precision: "float32", "float16" or "int8" for the search copy
+            compress_text: zlib-compress chunk text in the docstore
+        """
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision '{precision}'. Use one of {PRECISIONS}")
+
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(documents):
+            raise ValueError("vectors must be a (num_documents, dim) matrix")
+
+        os.makedirs(path, exist_ok=True)
+
+        # Docstore first, vectors/meta last: meta.json marks a complete store
+        meta_file = os.path.join(path, META_FILE)
+        if os.path.exists(meta_file):
+            os.remove(meta_file)
+
+        db_file = os.path.join(path, DOCSTORE_FILE)
+        if os.path.exists(db_file):
+            os.remove(db_file)
+        conn = sqlite3.connect(db_file)
+        try:
+            conn.execute(
+                "CREATE TABLE chunks ("
+                "row INTEGER PRIMARY KEY, chunk_id TEXT, content, metadata TEXT)"
+            )
+            conn.executemany(
+                "INSERT INTO chunks VALUES (?, ?, ?, ?)",
+                [
+                    (
+                        i,
+                        chunk_id_for(doc.page_content, doc.metadata),
+                        zlib.compress(doc.page_content.encode("utf-8"))
+                        if compress_text else doc.page_content,
+                        json.dumps(doc.metadata, ensure_ascii=False)
+                    )
+                    for i, doc in enumerate(documents)
+                ]
+            )
+            conn.execute("CREATE INDEX idx_chunk_id ON chunks (chunk_id)")
+            conn.commit()
+        finally:
+            conn.close()
+
+        np.save(os.path.join(path, VECTORS_FILE), vectors)
+        np.save(os.path.join(path, NORMS_FILE), np.einsum("ij,ij->i", vectors, vectors))
+
+        if precision == "float16":
+            np.save(os.path.join(path, COMPACT_FILES["float16"]), vectors.astype(np.float16))
+        elif precision == "int8":
+            codes, scales = quantize_int8(vectors)
+            np.save(os.path.join(path, COMPACT_FILES["int8"]), codes)
+            np.save(os.path.join(path, SCALES_FILE), scales)
+
+        meta = {
+            "format_version": FORMAT_VERSION,
+            "metric": "l2",
+            "count": int(vectors.shape[0]),
+            "dim": int(vectors.shape[1]),
+            "precision": precision,
+            "compress_text": compress_text
+        }
+        with open(meta_file, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+        return cls(path)
+
+    def _files(self):
+        """Files that make up this store (meta.json last)"""
+        files = [DOCSTORE_FILE, VECTORS_FILE, NORMS_FILE]
+        if self.precision != "float32":
+            files.append(COMPACT_FILES[self.precision])
+        if self.precision == "int8":
+            files.append(SCALES_FILE)
+        return files + [META_FILE]
+
+    def save(self, path):
+        """Copy the store files to another folder"""
+        if os.path.abspath(path) == os.path.abspath(self.path):
+            return
+        os.makedirs(path, exist_ok=True)
+        for name in self._files():
+            shutil.copyfile(os.path.join(self.path, name), os.path.join(path, name))
+
+    def __len__(self):
+        return self.meta["count"]
+
+    def _exact_distances(self, q, rows=None):
+        """Squared L2 distances against the float32 vectors"""
+        if rows is None:
+            return self.sq_norms - 2 * (self.vectors @ q) + q @ q
+        return self.sq_norms[rows] - 2 * (self.vectors[rows] @ q) + q @ q
+
+    def _blocks(self, compact):
+        """
+        Yield (start, end, float32 rows) over the whole store
+
+        Compact rows are converted into one reused buffer of
+        COMPACT_BLOCK_BYTES, so a scan never holds more than that.
+        """
+        if not compact:
+            for start in range(0, len(self), BLOCK_SIZE):
+                end = min(start + BLOCK_SIZE, len(self))
+                yield start, end, self.vectors[start:end]
+            return
+
+        rows = max(1, COMPACT_BLOCK_BYTES // (4 * self.meta["dim"]))
+        buffer = np.empty((min(rows, len(self)), self.meta["dim"]), dtype=np.float32)
+        for start in range(0, len(self), rows):
+            end = min(start + rows, len(self))
+            block = buffer[:end - start]
+            np.copyto(block, self.compact[start:end], casting="unsafe")
+            yield start, end, block
+
+    def _compact_distances(self, q):
+        """Approximate squared L2 distances from the compact vectors"""
+        dots = np.empty(len(self), dtype=np.float32)
+        for start, end, block in self._blocks(compact=True):
+            dots[start:end] = block @ q
+        if self.scales is not None:
+            dots *= self.scales
+        return self.sq_norms - 2 * dots + q @ q
+
+    @staticmethod
+    def _top_k(distances, k):
+        top = np.argpartition(distances, k - 1)[:k]
+        return top[np.argsort(distances[top])]
+
+    def search(self, query_vector, k, rescore=True):
+        """
+        Return (rows, distances) of the k nearest vectors (squared L2)
+
+        With a compact store, the top k * RESCORE_FACTOR candidates from the
+        compact scan are re-scored exactly unless `rescore` is False.
+        """
+        q = np.asarray(query_vector, dtype=np.float32)
+        k = min(k, len(self))
+        if k == 0:
+            return [], []
+
+        if self.compact is None:
+            distances = self._exact_distances(q)
+            top = self._top_k(distances, k)
+            return top.tolist(), distances[top].tolist()
+
+        approx = self._compact_distances(q)
+        if not rescore:
+            top = self._top_k(approx, k)
+            return top.tolist(), approx[top].tolist()
+
+        candidates = np.sort(self._top_k(approx, min(k * self.RESCORE_FACTOR, len(self))))
+        exact = self._exact_distances(q, candidates)
+        best = self._top_k(exact, k)
+        return candidates[best].tolist(), exact[best].tolist()
+
+    def _batch_top_k(self, queries, k, compact):
+        """
+        Top-k rows per query with one matmul per block of rows
+
+        Returns (rows, distances), both shaped (num_queries, k) and sorted.
+        """
+        q_norms = np.einsum("ij,ij->i", queries, queries)
+
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        best_dist = np.empty((len(queries), 0), dtype=np.float32)
+
+        for start, end, block in self._blocks(compact):
+            dots = queries @ block.T
+            if compact and self.scales is not None:
+                dots *= self.scales[start:end]
+            dist = self.sq_norms[start:end] - 2 * dots + q_norms[:, None]
+
+            kk = min(k, end - start)
+            part = np.argpartition(dist, kk - 1, axis=1)[:, :kk]
+            best_rows = np.concatenate([best_rows, part + start], axis=1)
+            best_dist = np.concatenate([best_dist, np.take_along_axis(dist, part, axis=1)], axis=1)
+
+            # Keep only the running top-k between blocks
+            if best_rows.shape[1] > k:
+                keep = np.argpartition(best_dist, k - 1, axis=1)[:, :k]
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+                best_dist = np.take_along_axis(best_dist, keep, axis=1)
+
+        order = np.argsort(best_dist, axis=1)
+        return np.take_along_axis(best_rows, order, axis=1), np.take_along_axis(best_dist, order, axis=1)
+
+    def search_batch(self, query_vectors, k, rescore=True):
+        """
+        Batched `search`: one (num_queries x num_rows) matmul per block
+
+        Returns (rows, distances) as lists of lists, one per query.
+        """
+        queries = np.asarray(query_vectors, dtype=np.float32).reshape(-1, self.meta["dim"])
+        k = min(k, len(self))
+        if k == 0 or len(queries) == 0:
+            return [[] for _ in queries], [[] for _ in queries]
+
+        if self.compact is None:
+            rows, dist = self._batch_top_k(queries, k, compact=False)
+            return rows.tolist(), dist.tolist()
+
+        if not rescore:
+            rows, dist = self._batch_top_k(queries, k, compact=True)
+            return rows.tolist(), dist.tolist()
+
+        candidates, _ = self._batch_top_k(queries, min(k * self.RESCORE_FACTOR, len(self)), compact=True)
+
+        # Exact re-score: gather only the candidate rows from the float32 file
+        unique_rows, inverse = np.unique(candidates, return_inverse=True)
+        exact_vectors = np.asarray(self.vectors[unique_rows])[inverse.reshape(candidates.shape)]
+        exact = (
+            self.sq_norms[candidates]
+            - 2 * np.einsum("qcd,qd->qc", exact_vectors, queries)
+            + np.einsum("ij,ij->i", queries, queries)[:, None]
+        )
+
+        best = np.argsort(exact, axis=1)[:, :k]
+        return (
+            np.take_along_axis(candidates, best, axis=1).tolist(),
+            np.take_along_axis(exact, best, axis=1).tolist()
+        )
+
+    def memory_report(self):
+        """Bytes scanned per query vs. a plain float32 index"""
+        float32_bytes = int(self.vectors.nbytes + self.sq_norms.nbytes)
+        if self.compact is None:
+            search_bytes = float32_bytes
+        else:
+            search_bytes = int(self.compact.nbytes + self.sq_norms.nbytes)
+            if self.scales is not None:
+                search_bytes += int(self.scales.nbytes)
+
+        return {
+            "precision": self.precision,
+            "float32_bytes": float32_bytes,
+            "search_bytes": search_bytes,
+            "memory_ratio": search_bytes / float32_bytes
+        }
+
+    def recall_at_k(self, query_vectors, k, rescore=True):
+        """Share of the exact top-k found by `search` (1.0 for float32)"""
+        query_vectors = np.asarray(query_vectors, dtype=np.float32)
+        k = min(k, len(self))
+        if k == 0 or len(query_vectors) == 0:
+            return 1.0
+
+        hits = 0
+        for q in query_vectors:
+            truth = set(self._top_k(self._exact_distances(q), k).tolist())
+            rows, _ = self.search(q, k, rescore=rescore)
+            hits += len(truth.intersection(rows))
+        return hits / (k * len(query_vectors))
+
+    def _load_rows(self, rows):
+        """Read documents for a set of rows in one query → {row: Document}"""
+        rows = sorted({int(r) for r in rows})
+        if not rows:
+            return {}
+
+        placeholders = ",".join("?" * len(rows))
+        with self._lock:
+            records = self._conn.execute(
+                f"SELECT row, chunk_id, content, metadata FROM chunks WHERE row IN ({placeholders})",
+                rows
+            ).fetchall()
+
+        return {row: self._to_document(chunk_id, content, metadata) for row, chunk_id, content, metadata in records}
+
+    @staticmethod
+    def _to_document(chunk_id, content, metadata):
+        if isinstance(content, bytes):
+            content = zlib.decompress(content).decode("utf-8")
+        return Document(id=chunk_id, page_content=content, metadata=json.loads(metadata))
+
+    def get_documents(self, rows):
+        """Load documents for the given rows, keeping the order"""
+        by_row = self._load_rows(rows)
+        return [by_row[r] for r in rows if r in by_row]
+
+    def get_documents_batch(self, row_lists):
+        """`get_documents` for several queries with a single docstore read"""
+        by_row = self._load_rows(r for rows in row_lists for r in rows)
+        return [[by_row[r] for r in rows if r in by_row] for rows in row_lists]
+
+    def get_documents_by_ids(self, chunk_ids):
+        """Load documents by chunk ID, keeping the order (None where not found)"""
+        unique = sorted(set(chunk_ids))
+        if not unique:
+            return []
+
+        placeholders = ",".join("?" * len(unique))
+        with self._lock:
+            records = self._conn.execute(
+                f"SELECT chunk_id, content, metadata FROM chunks WHERE chunk_id IN ({placeholders})",
+                unique
+            ).fetchall()
+
+        by_id = {chunk_id: self._to_document(chunk_id, content, metadata) for chunk_id, content, metadata in records}
+        return [by_id.get(chunk_id) for chunk_id in chunk_ids]
+
+    def close(self):
+        """Close the docstore connection"""
+        self._conn.close()
@@ -0,0 +1,65 @@
+"""
+Known Questions - sidebar quick questions and the evaluation set
+"""
+
+
+# Quick questions shown in the app sidebar
+QUICK_QUESTIONS = [
+    "كم مدة الإجازة السنوية؟",
+    "ما سياسة الاستقطاب والتوظيف؟",
+    "ما مدة فترة الاختبار؟",
+    "ما الموارد المالية للمركز؟"
+]
+
+
+# 12 evaluation questions
+EVAL_QUESTIONS = [
+    {
+        "question": "ما هو الغرض من سياسة الاستقطاب والتوظيف؟",
+        "ground_truth": "تحديد أساس استقطاب وتوظيف الأشخاص وضمان تكافؤ الفرص على أساس الجدارة والمؤهلات"
+    },
+    {
+        "question": "كم مدة فترة الاختبار؟",
+        "ground_truth": "90 يوماً من تاريخ توقيع عقد العمل"
+    },
+    {
+        "question": "كم مدة الإجازة السنوية؟",
+        "ground_truth": "33 يوماً مدفوعة الأجر مع تذكرة سفر"
+    },
+    {
+        "question": "ما عواقب عدم الالتزام بقواعد السلوك؟",
+        "ground_truth": "إجراءات تأديبية تشمل التوبيخ أو تعليق العمل أو خفض المرتبة أو إنهاء الخدمة"
+    },
+    {
+        "question": "ما الغرض من سياسة الصحة والسلامة؟",
+        "ground_truth": "الحفاظ على أفضل ظروف عمل وضمان شعور الموظفين بالأمان"
+    },
+    {
+        "question": "ما الهدف من سياسة تعارض المصالح؟",
+        "ground_truth": "حماية النزاهة ومنع تأثير المصالح الشخصية على أداء العاملين"
+    },
+    {
+        "question": "ما الهدف من سياسة المحاسبة المالية؟",
+        "ground_truth": "تحديد قواعد مسك الدفاتر وتنظيم القيود المحاسبية والموازنات"
+    },
+    {
+        "question": "ما ضوابط سياسة الاستثمار الآمن؟",
+        "ground_truth": "تشكيل لجنة استثمار ومشروعية الاستثمار والتخطيط المحكم والابتعاد عن المخاطر العالية"
+    },
+    {
+        "question": "ما هي الموارد المالية للمركز؟",
+        "ground_truth": "رسوم العضوية والتبرعات والإعانات الحكومية وعائدات الاستثمار"
+    },
+    {
+        "question": "هل توجد إجازة طارئة؟",
+        "ground_truth": "نعم، يحق للموظف الحصول على إجازة طارئة في حالات معينة"
+    },
+    {
+        "question": "ما سياسة الإبلاغ عن المخالفات؟",
+        "ground_truth": "توفير قنوات للإبلاغ مع حماية المبلغين من الانتقام"
+    },
+    {
+        "question": "كيف يتعامل المركز مع غسل الأموال؟",
+        "ground_truth": "إجراءات وقائية تشمل تقييم المخاطر والقنوات غير النقدية والتدريب"
+    }
+]
@@ -3,25 +3,53 @@ RAG Pipeline
 """
 
 import time
-import redis
-import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
+from src.cache_codec import encode_entry, decode_entry
+from src.metrics import REGISTRY, span
+from src.single_flight import SingleFlight
+
+
+_cache_pools = {}
+_cache_pools_lock = threading.Lock()
+
+
+def get_cache_pool(host="localhost", port=6379, db=0):
+    """One Redis connection pool per (host, port, db), shared by the whole process"""
+    import redis
+    
+    key = (host, port, db)
+    with _cache_pools_lock:
+        if key not in _cache_pools:
+            _cache_pools[key] = redis.ConnectionPool(
+                host=host,
+                port=port,
+                db=db
+            )
+        return _cache_pools[key]
 
 
 class RAGPipeline:
     """Simple RAG: Retriever + Generator + Cache + Web Search"""
     
-    def __init__(self, retriever, generator, enable_cache=True, enable_web_search=True):
+    def __init__(self, retriever, generator, enable_cache=True, enable_web_search=True, metrics=None,
+                 cache=None, lease=None, cache_ttl=3600):
         self.retriever = retriever
         self.generator = generator
+        self.metrics = metrics or REGISTRY
         self.enable_cache = enable_cache
         self.enable_web_search = enable_web_search
-        self.cache = redis.Redis(
-          host="localhost",
-          port=6379,
-           db=0,
-          decode_responses=True)
-                                                                                                                 
+        # Any client with get/setex/dbsize/flushdb works (defaults to local Redis)
+        if cache is None:
+            import redis
+            cache = redis.Redis(connection_pool=get_cache_pool())
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        # Identical concurrent questions share one computation: in-process
+        # always, across processes when a RedisLease is given
+        self.flights = SingleFlight()
+        self.lease = lease
         self.web_search = None
         
         # Initialize web search (try multiple methods for different versions)
@@ -66,79 +94,340 @@ class RAGPipeline:
             print(f"❌ Web search error: {e}")
             return None
     
-    def query(self, question, return_contexts=False, use_web_search=False):
-        """Answer a question with optional web search"""
-        start = time.time()
-        
-        # Check cache
-        if self.enable_cache:
-           cached = self.cache.get(question)
-           if cached:
-              result = json.loads(cached)
-              result["cached"] = True
-              result["latency"] = time.time() - start
-              return result
-        
-        # Retrieve contexts from vector store
-        docs = self.retriever.retrieve(question)
-        context = "\n\n".join([d.page_content for d in docs])
-        
-        # Generate initial answer
-        answer = self.generator.generate(question, context)
-        
-        # Check if answer is unclear
-        unclear_indicators = [
-            "لا تتوفر إجابة",
-            "غير واضح", 
-            "لم يتم ذكر",
-            "لا يوجد",
-            "لم أجد"
-        ]
+    # Phrases that mark an answer as unclear → try web search
+    UNCLEAR_INDICATORS = [
+        "لا تتوفر إجابة",
+        "غير واضح", 
+        "لم يتم ذكر",
+        "لا يوجد",
+        "لم أجد"
+    ]
+    
+    @staticmethod
+    def cache_key(question):
+        """Canonical form of a question: same key → same cache entry / shared computation"""
+        return " ".join(question.split())
+    
+    @staticmethod
+    def _new_trace():
+        """Per-query timing/token accumulator"""
+        return {"start": time.time(), "timings": {}, "tokens": {"input": 0, "output": 0}}
+    
+    def _record(self, result, trace, cache_tier=None):
+        """Attach timings/tokens to a result and report it to the metrics registry"""
+        trace["timings"]["total"] = time.time() - trace["start"]
+        result["latency"] = trace["timings"]["total"]
+        result["timings"] = trace["timings"]
+        result["tokens"] = trace["tokens"]
+        result["cache_tier"] = cache_tier
+        if trace.get("warmup"):
+            result["warmup"] = True
+        self.metrics.observe(result)
+        return result
+    
+    def _get_cached(self, question, trace):
+        """Return the cached result for a question, or None"""
+        if not self.enable_cache:
+            return None
+        with span(trace["timings"], "cache_lookup"):
+            blob = self.cache.get(self.cache_key(question))
+            entry = decode_entry(blob) if blob else None
+            if entry is None:
+                return None
+            contexts = entry.get("contexts")
+            if contexts is None:
+                # Rehydrate chunk text from the local docstore
+                docs = self.retriever.get_chunks(entry["chunk_ids"])
+                if any(d is None for d in docs):
+                    # Index was rebuilt without these chunks → recompute
+                    return None
+                contexts = [d.page_content for d in docs]
         
-        needs_web_search = any(indicator in answer for indicator in unclear_indicators)
+        result = {
+            "question": entry["question"],
+            "answer": entry["answer"],
+            "contexts": contexts,
+            "num_contexts": len(contexts),
+            "cached": True,
+            "web_search_used": entry["web_search_used"]
+        }
+        return self._record(result, trace, cache_tier="redis")
+    
+    def _web_context(self, question, answer, use_web_search, trace):
+        """Web results to add to the context if the answer needs them, else None"""
+        needs_web_search = any(indicator in answer for indicator in self.UNCLEAR_INDICATORS)
+        if not ((needs_web_search or use_web_search) and self.enable_web_search and self.web_search):
+            return None
         
-        # Try web search if needed
-        web_used = False
-        if (needs_web_search or use_web_search) and self.enable_web_search and self.web_search:
-            print(f"🔍 Searching web for: {question[:50]}...")
+        print(f"🔍 Searching web for: {question[:50]}...")
+        with span(trace["timings"], "web_search"):
             web_results = self._do_web_search(question)
-            
-            if web_results:
-                web_context = f"\n\n**معلومات من الإنترنت:**\n{web_results}"
-                
-                # Regenerate with web context
-                full_context = context + web_context
-                answer = self.generator.generate(question, full_context)
-                web_used = True
-                print("✅ Web search successful")
-            else:
-                print("❌ Web search returned no results")
+        if not web_results:
+            print("❌ Web search returned no results")
+            return None
         
-        # Build result
+        print("✅ Web search successful")
+        return f"\n\n**معلومات من الإنترنت:**\n{web_results}"
+    
+    def _finish(self, question, answer, docs, web_used, trace):
+        """Build the result dict and cache it"""
         result = {
             "question": question,
             "answer": answer,
             "contexts": [d.page_content for d in docs],
             "num_contexts": len(docs),
-            "latency": time.time() - start,
             "cached": False,
             "web_search_used": web_used
         }
         
-        if return_contexts:
-            result["contexts"] = [d.page_content for d in docs]
-        
         # Cache it
         if self.enable_cache:
-            self.cache.setex(
-               question,
-                3600,  
-                json.dumps(result)
-    )
-
+            with span(trace["timings"], "cache_store"):
+                self.cache.setex(
+                    self.cache_key(question),
+                    self.cache_ttl,
+                    encode_entry(result, docs)
+                )
+        
+        return self._record(result, trace)
+    
+    def _answer(self, question, docs, use_web_search, trace):
+        """Generate (and maybe regenerate with web results) from retrieved docs"""
+        context = "\n\n".join([d.page_content for d in docs])
+        
+        # Generate initial answer
+        with span(trace["timings"], "generate"):
+            answer = self.generator.generate(question, context, usage=trace["tokens"])
+        
+        # Regenerate with web context if the answer is unclear
+        web_used = False
+        web_context = self._web_context(question, answer, use_web_search, trace)
+        if web_context:
+            with span(trace["timings"], "generate_web"):
+                answer = self.generator.generate(question, context + web_context, usage=trace["tokens"])
+            web_used = True
+        
+        return self._finish(question, answer, docs, web_used, trace)
+    
+    def _retrieve(self, questions, traces):
+        """Embed + search for several questions, timing both stages"""
+        timings = {}
+        with span(timings, "embed"):
+            vectors = self.retriever.embed_queries(questions)
+        with span(timings, "search"):
+            all_docs = self.retriever.search_vectors(vectors)
         
+        # In a batch every question waited for the whole batch
+        for trace in traces:
+            trace["timings"].update(timings)
+        return all_docs
+    
+    def query(self, question, return_contexts=False, use_web_search=False):
+        """Answer a question with optional web search"""
+        trace = self._new_trace()
+        
+        # Check cache
+        cached = self._get_cached(question, trace)
+        if cached:
+            return cached
+        
+        # Join an identical in-flight query instead of computing it again
+        return self._query_uncached(question, use_web_search, trace)
+    
+    def refresh(self, question, use_web_search=False):
+        """Recompute a question and overwrite its cache entry (used by warm-up)"""
+        trace = self._new_trace()
+        trace["warmup"] = True
+        return self._query_uncached(question, use_web_search, trace, refresh=True)
+    
+    def cache_ttl_left(self, question):
+        """Seconds until the cached answer expires (None if not cached)"""
+        ttl = self.cache.ttl(self.cache_key(question))
+        if ttl is None or ttl == -2:
+            return None
+        return float("inf") if ttl == -1 else ttl
+    
+    @classmethod
+    def _flight_key(cls, question, use_web_search):
+        """Coalescing key: same canonical question + same web-search choice"""
+        return cls.cache_key(question) + ("|web" if use_web_search else "")
+    
+    def _query_uncached(self, question, use_web_search, trace, docs=None, refresh=False):
+        """Compute an answer, joining an identical in-flight query if there is one"""
+        key = self._flight_key(question, use_web_search)
+        result, shared = self.flights.do(
+            key,
+            lambda: self._compute(question, key, use_web_search, trace, docs, refresh)
+        )
+        if shared:
+            return self._record(dict(result, question=question), trace, cache_tier="inflight")
         return result
     
+    def _lead(self, question, key, trace, refresh=False):
+        """
+        As the in-process leader for `key`: take the cross-process lease
+        and look in the cache again → (lease token, cached result or None)
+        """
+        token = None
+        if self.lease is not None:
+            token = self.lease.acquire(key)
+            if token is None:
+                # Another process is answering: wait for its cached result
+                cached = self.lease.wait(key, lambda: self._get_cached(question, trace))
+                if cached:
+                    return None, cached
+                token = self.lease.acquire(key)
+        
+        if not refresh:
+            # The previous leader may have stored its answer right after our lookup
+            cached = self._get_cached(question, trace)
+            if cached:
+                self._release(key, token)
+                return None, cached
+        return token, None
+    
+    def _release(self, key, token):
+        if token is not None:
+            self.lease.release(key, token)
+    
+    def _compute(self, question, key, use_web_search, trace, docs=None, refresh=False):
+        """Retrieve (unless `docs` are given) + generate, as the leader for `key`"""
+        token, cached = self._lead(question, key, trace, refresh)
+        if cached:
+            return cached
+        
+        try:
+            # Retrieve contexts from vector store
+            if docs is None:
+                docs = self._retrieve([question], [trace])[0]
+            return self._answer(question, docs, use_web_search, trace)
+        finally:
+            self._release(key, token)
+    
+    def query_batch(self, questions, use_web_search=False, max_workers=4):
+        """
+        Answer many questions: cached ones directly, the rest with one
+        batched retrieval and up to `max_workers` LLM calls in parallel
+        """
+        traces = [self._new_trace() for _ in questions]
+        results = [self._get_cached(q, t) for q, t in zip(questions, traces)]
+        
+        # Repeated questions in the batch are answered once
+        misses, duplicates = [], {}
+        for i, r in enumerate(results):
+            if r is None:
+                first = duplicates.setdefault(self._flight_key(questions[i], use_web_search), i)
+                if first == i:
+                    misses.append(i)
+        if not misses:
+            return results
+        
+        all_docs = self._retrieve([questions[i] for i in misses], [traces[i] for i in misses])
+        
+        # Each miss still coalesces with identical queries in flight elsewhere
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            answered = executor.map(
+                lambda i, docs: self._query_uncached(questions[i], use_web_search, traces[i], docs=docs),
+                misses,
+                all_docs
+            )
+            for i, result in zip(misses, answered):
+                results[i] = result
+        
+        for i, r in enumerate(results):
+            if r is None:
+                first = duplicates[self._flight_key(questions[i], use_web_search)]
+                results[i] = self._record(dict(results[first], question=questions[i]), traces[i], cache_tier="inflight")
+        
+        return results
+    
+    @staticmethod
+    def _replay(result):
+        """Events for an answer that is already complete"""
+        yield {"type": "contexts", "contexts": result["contexts"]}
+        yield {"type": "token", "text": result["answer"]}
+        yield {"type": "done", "result": result}
+    
+    def stream_query(self, question, use_web_search=False):
+        """
+        Answer a question as a stream of events:
+        {"type": "contexts"}, {"type": "token"}..., {"type": "reset"} when the
+        answer is regenerated with web results, and finally {"type": "done"}
+        
+        Joins an identical in-flight query (streamed or not) instead of
+        generating again; its answer then arrives as a single token.
+        """
+        trace = self._new_trace()
+        
+        cached = self._get_cached(question, trace)
+        if cached:
+            yield from self._replay(cached)
+            return
+        
+        key = self._flight_key(question, use_web_search)
+        call, leader = self.flights.begin(key)
+        if not leader:
+            result = self.flights.wait(call)
+            yield from self._replay(self._record(dict(result, question=question), trace, cache_tier="inflight"))
+            return
+        
+        result, error = None, None
+        try:
+            token, cached = self._lead(question, key, trace)
+            if cached:
+                result = cached
+            else:
+                try:
+                    result = yield from self._stream_compute(question, use_web_search, trace)
+                finally:
+                    self._release(key, token)
+        except GeneratorExit:
+            error = RuntimeError("Streaming answer was abandoned before it finished")
+            raise
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            # Waiting callers get the answer before our own "done" event
+            self.flights.finish(key, call, result, error)
+        
+        if cached:
+            yield from self._replay(cached)
+        else:
+            yield {"type": "done", "result": result}
+    
+    def _stream_compute(self, question, use_web_search, trace):
+        """Retrieve + stream contexts/token events; return the result dict"""
+        docs = self._retrieve([question], [trace])[0]
+        context = "\n\n".join([d.page_content for d in docs])
+        yield {"type": "contexts", "contexts": [d.page_content for d in docs]}
+        
+        answer = yield from self._stream_answer(question, context, "generate", trace)
+        
+        web_used = False
+        web_context = self._web_context(question, answer, use_web_search, trace)
+        if web_context:
+            yield {"type": "reset"}
+            answer = yield from self._stream_answer(question, context + web_context, "generate_web", trace)
+            web_used = True
+        
+        return self._finish(question, answer, docs, web_used, trace)
+    
+    def _stream_answer(self, question, context, stage, trace):
+        """Yield token events; return the full answer"""
+        parts = []
+        first_token = None
+        start = time.perf_counter()
+        for text in self.generator.stream(question, context, usage=trace["tokens"]):
+            if first_token is None:
+                first_token = time.perf_counter() - start
+            parts.append(text)
+            yield {"type": "token", "text": text}
+        trace["timings"][stage] = time.perf_counter() - start
+        if first_token is not None:
+            trace["timings"][f"{stage}_first_token"] = first_token
+        return "".join(parts)
+    
     def clear_cache(self):
         """Clear the cache"""
         self.cache.flushdb()
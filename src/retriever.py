@@ -2,31 +2,63 @@
 Retriever Module
 """
 
-from langchain_openai import OpenAIEmbeddings
-from langchain_community.vectorstores import FAISS
+import numpy as np
 import os
+from langchain_core.documents import Document
+
+from src.mmap_store import MmapVectorStore
 
 
 class Retriever:
-    """FAISS vector store for document retrieval"""
+    """Vector store for document retrieval (memory-mapped or FAISS)"""
 
-    def __init__(self, embedding_model="text-embedding-3-small", top_k=6, vector_store_path=None):
+    def __init__(self, embedding_model="text-embedding-3-small", top_k=6, vector_store_path=None,
+                 storage="mmap", embeddings=None, precision="float32", compress_text=False):
+        """
+        Args:
+            storage: "mmap" (memory-mapped vectors + SQLite docstore, no pickle)
+                     or "faiss" (legacy FAISS.save_local format)
+            embeddings: LangChain embeddings object (defaults to OpenAI)
+            precision: search copy for new mmap stores: "float32", "float16" or "int8"
+            compress_text: zlib-compress chunk text in new mmap stores
+        """
         self.top_k = top_k
         self.vector_store_path = vector_store_path or "data/vector_store"
-        self.embeddings = OpenAIEmbeddings(model=embedding_model)
+        self.storage = storage
+        self.precision = precision
+        self.compress_text = compress_text
+        if embeddings is None:
+            # Imported on first use: openai/langchain_openai dominate import time
+            from langchain_openai import OpenAIEmbeddings
+            embeddings = OpenAIEmbeddings(model=embedding_model)
+        self.embeddings = embeddings
         self.db = None
 
     def create_vector_store(self, chunks):
-        """Build FAISS index from chunks"""
-        self.db = FAISS.from_documents(chunks, self.embeddings)
-        self.save()
+        """Build the index from chunks"""
+        if self.storage == "mmap":
+            vectors = self.embeddings.embed_documents([c.page_content for c in chunks])
+            self.db = MmapVectorStore.build(
+                self.vector_store_path,
+                vectors,
+                chunks,
+                precision=self.precision,
+                compress_text=self.compress_text
+            )
+        else:
+            from langchain_community.vectorstores import FAISS
+            self.db = FAISS.from_documents(chunks, self.embeddings)
+            self.save()
 
     def save(self, path=None):
         """Save vector store to disk"""
         path = path or self.vector_store_path
         if self.db:
             os.makedirs(path, exist_ok=True)
-            self.db.save_local(path)
+            if self.storage == "mmap":
+                self.db.save(path)
+            else:
+                self.db.save_local(path)
 
     def load_vector_store(self):
         """Load vector store from disk"""
@@ -36,12 +68,22 @@ class Retriever:
         if not os.path.exists(path):
             return False
 
+        if self.storage == "mmap":
+            if not MmapVectorStore.exists(path):
+                return False
+            try:
+                self.db = MmapVectorStore(path)
+                return True
+            except Exception:
+                return False
+
         # Check FAISS index file
         index_file = os.path.join(path, "index.faiss")
         if not os.path.exists(index_file):
             return False
 
         try:
+            from langchain_community.vectorstores import FAISS
             self.db = FAISS.load_local(
                 path,
                 self.embeddings,
@@ -51,7 +93,36 @@ class Retriever:
         except Exception:
             return False
 
+    def embed_queries(self, questions):
+        """Embed all questions in one embeddings request"""
+        return self.embeddings.embed_documents(list(questions))
+
+    def search_vectors(self, vectors):
+        """Top-k documents for each query vector (one batched search)"""
+        if self.storage == "mmap":
+            rows, _ = self.db.search_batch(vectors, self.top_k)
+            return self.db.get_documents_batch(rows)
+
+        _, ids = self.db.index.search(np.asarray(vectors, dtype=np.float32), self.top_k)
+        return [
+            [self.db.docstore.search(self.db.index_to_docstore_id[i]) for i in row if i != -1]
+            for row in ids
+        ]
+
+    def get_chunks(self, chunk_ids):
+        """Documents for stable chunk IDs, in order (None where not found)"""
+        if self.storage == "mmap":
+            return self.db.get_documents_by_ids(chunk_ids)
+
+        docs = [self.db.docstore.search(chunk_id) for chunk_id in chunk_ids]
+        return [d if isinstance(d, Document) else None for d in docs]
+
+    def retrieve_batch(self, questions):
+        """Get relevant chunks for many questions → one list per question"""
+        if not questions:
+            return []
+        return self.search_vectors(self.embed_queries(questions))
+
     def retrieve(self, question):
         """Get relevant chunks for a question"""
-        retriever = self.db.as_retriever(search_kwargs={"k": self.top_k})
-        return retriever.invoke(question)
+        return self.retrieve_batch([question])[0]
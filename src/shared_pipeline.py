@@ -0,0 +1,172 @@
+"""
+Shared Pipeline - one RAGPipeline per process
+"""
+
+import os
+import threading
+
+from src.config import Config
+from src.retriever import Retriever
+from src.generator import Generator
+from src.hedged_generator import HedgedGenerator
+from src.rag_pipeline import RAGPipeline
+from src.metrics import REGISTRY, JsonlExporter
+from src.single_flight import RedisLease
+from src.questions import QUICK_QUESTIONS, EVAL_QUESTIONS
+from src.warmup import CacheWarmer, load_questions_file
+from src.utils import create_directories
+
+
+_lock = threading.Lock()
+_pipeline = None
+_index_stamp = None
+_failed_stamp = None  # Build that failed to load; not retried until it changes
+_warmer = None
+
+
+def _make_retriever(embeddings=None):
+    """Retriever from Config (reuses an embeddings client if given)"""
+    return Retriever(
+        embedding_model=Config.EMBEDDING_MODEL,
+        top_k=Config.TOP_K,
+        vector_store_path=Config.VECTOR_STORE_PATH,
+        storage=Config.VECTOR_STORE_FORMAT,
+        embeddings=embeddings,
+        precision=Config.VECTOR_PRECISION,
+        compress_text=Config.COMPRESS_CHUNK_TEXT
+    )
+
+
+def index_stamp(path=None):
+    """Modification time of the file written last by a build (None if missing)"""
+    path = path or Config.VECTOR_STORE_PATH
+    for name in ("meta.json", "index.faiss"):
+        marker = os.path.join(path, name)
+        if os.path.exists(marker):
+            return os.path.getmtime(marker)
+    return None
+
+
+def build_pipeline():
+    """Create retriever + generator + pipeline from Config"""
+    Config.setup()
+    create_directories()
+
+    retriever = _make_retriever()
+
+    generator = Generator(
+        model=Config.LLM_MODEL,
+        temperature=Config.LLM_TEMPERATURE
+    )
+    if Config.LLM_FALLBACK_PROVIDER:
+        fallback = Generator(
+            model=Config.LLM_FALLBACK_MODEL,
+            temperature=Config.LLM_TEMPERATURE,
+            provider=Config.LLM_FALLBACK_PROVIDER
+        )
+        generator = HedgedGenerator(
+            [generator, fallback],
+            min_delay=Config.HEDGE_MIN_DELAY,
+            max_delay=Config.HEDGE_MAX_DELAY
+        )
+
+    # The index is built offline by build_index.py, never here
+    if not retriever.load_vector_store():
+        raise FileNotFoundError(
+            f"Vector store not found in {Config.VECTOR_STORE_PATH}. Run: python build_index.py"
+        )
+
+    if Config.METRICS_JSONL_PATH:
+        REGISTRY.add_exporter(JsonlExporter(Config.METRICS_JSONL_PATH))
+
+    pipeline = RAGPipeline(
+        retriever,
+        generator,
+        enable_cache=Config.ENABLE_CACHE,
+        cache_ttl=Config.CACHE_TTL
+    )
+    if Config.ENABLE_CACHE and Config.COALESCE_ACROSS_PROCESSES:
+        pipeline.lease = RedisLease(pipeline.cache, lease=Config.COALESCE_LEASE)
+    return pipeline
+
+
+def start_warmer(pipeline):
+    """Start the background cache warm-up for `pipeline` (once per process)"""
+    global _warmer
+
+    if _warmer is None:
+        questions = (
+            QUICK_QUESTIONS
+            + [q["question"] for q in EVAL_QUESTIONS]
+            + load_questions_file(Config.WARMUP_QUESTIONS_FILE)
+        )
+        _warmer = CacheWarmer(
+            pipeline,
+            questions,
+            log_path=Config.METRICS_JSONL_PATH,
+            top_n=Config.WARMUP_TOP_N,
+            interval=Config.WARMUP_INTERVAL,
+            refresh_before=Config.WARMUP_REFRESH_BEFORE,
+            max_workers=Config.WARMUP_WORKERS,
+            # One refresh per question across all processes sharing the cache
+            lease=RedisLease(pipeline.cache, lease=Config.COALESCE_LEASE, prefix="warmup:")
+        ).start()
+    return _warmer
+
+
+def get_pipeline():
+    """Return the process-wide pipeline, building it on first use"""
+    global _pipeline, _index_stamp
+
+    if _pipeline is None:
+        with _lock:
+            if _pipeline is None:
+                pipeline = build_pipeline()
+                _index_stamp = index_stamp()
+                _pipeline = pipeline
+                if Config.ENABLE_CACHE and Config.ENABLE_WARMUP:
+                    start_warmer(pipeline)
+    return _pipeline
+
+
+def _swap_retriever(pipeline):
+    """Load the index again and swap it into `pipeline` (caller holds _lock)"""
+    global _index_stamp, _failed_stamp
+
+    # Stamp first: a build published while loading is picked up next time
+    stamp = index_stamp()
+    retriever = _make_retriever(embeddings=pipeline.retriever.embeddings)
+    if not retriever.load_vector_store():
+        if stamp != _failed_stamp:
+            print(f"❌ Could not load the index at {Config.VECTOR_STORE_PATH}; keeping the current one")
+            _failed_stamp = stamp
+        return False
+    pipeline.retriever = retriever
+    _index_stamp = stamp
+    return True
+
+
+def reload_index():
+    """
+    Load the index again and swap it into the shared pipeline
+
+    The new retriever is fully loaded before the swap, so running queries
+    keep using the old one and new queries see the new one.
+    """
+    pipeline = get_pipeline()
+    with _lock:
+        return _swap_retriever(pipeline)
+
+
+def reload_if_changed():
+    """Hot-swap the index if it was rebuilt on disk since the last load"""
+    if _pipeline is None:
+        return False
+    stamp = index_stamp()
+    if stamp is None or stamp in (_index_stamp, _failed_stamp):
+        return False
+    with _lock:
+        # Another request may have reloaded it (or failed to) while we waited
+        if index_stamp() in (_index_stamp, _failed_stamp):
+            return False
+        return _swap_retriever(_pipeline)
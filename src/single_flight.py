@@ -0,0 +1,122 @@
+"""
+Single-Flight - coalesce identical in-flight work
+"""
+
+import threading
+import time
+import uuid
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    In-process coalescing: while `do(key, fn)` runs for a key, other
+    threads calling `do` with the same key wait and get the same result
+    (or the same exception) instead of running `fn` again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def begin(self, key):
+        """
+        Join the computation for key → (call, leader). The leader must end
+        it with finish(); other callers get its outcome from wait(call).
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                return call, False
+            call = self._calls[key] = _Call()
+            return call, True
+
+    def finish(self, key, call, result=None, error=None):
+        """Publish the leader's result (or exception) and end the flight"""
+        call.result = result
+        call.error = error
+        with self._lock:
+            del self._calls[key]
+        call.done.set()
+
+    @staticmethod
+    def wait(call):
+        """Block until the leader finishes → its result (or raise its error)"""
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def do(self, key, fn):
+        """Run fn() once per key at a time → (result, shared)"""
+        call, leader = self.begin(key)
+        if not leader:
+            return self.wait(call), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self.finish(key, call, error=e)
+            raise
+        self.finish(key, call, result=result)
+        return result, False
+
+    def in_flight(self):
+        """Number of keys currently being computed"""
+        with self._lock:
+            return len(self._calls)
+
+
+class RedisLease:
+    """
+    Cross-process coalescing with a Redis lock that expires on its own
+    (the lease), so a crashed holder never blocks a key for longer than
+    `lease` seconds.
+    """
+
+    # Delete the lock only if we still own it
+    RELEASE_SCRIPT = (
+        "if redis.call('get', KEYS[1]) == ARGV[1] then "
+        "return redis.call('del', KEYS[1]) else return 0 end"
+    )
+
+    def __init__(self, client, lease=60.0, poll_interval=0.05, prefix="lock:"):
+        self.client = client
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.prefix = prefix
+
+    def acquire(self, key):
+        """Try to take the lock → token, or None if another process holds it"""
+        token = uuid.uuid4().hex
+        if self.client.set(self.prefix + key, token, nx=True, px=int(self.lease * 1000)):
+            return token
+        return None
+
+    def release(self, key, token):
+        """Give the lock back (no-op if the lease already expired)"""
+        try:
+            self.client.eval(self.RELEASE_SCRIPT, 1, self.prefix + key, token)
+        except Exception as e:
+            print(f"⚠️ Lock release failed: {e}")
+
+    def wait(self, key, check):
+        """
+        Poll `check()` until it returns a value, the lock is released, or
+        the lease runs out → check()'s value or None
+        """
+        deadline = time.time() + self.lease
+        while time.time() < deadline:
+            value = check()
+            if value is not None:
+                return value
+            if not self.client.exists(self.prefix + key):
+                return check()
+            time.sleep(self.poll_interval)
+        return None
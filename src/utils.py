@@ -3,7 +3,6 @@ Utility Functions -
 """
 
 import os
-import streamlit as st
 
 
 def create_directories():
@@ -14,6 +13,8 @@ def create_directories():
 
 def check_pdf_files(pdf_paths):
     """Check if PDFs exist"""
+    import streamlit as st
+    
     missing = [p for p in pdf_paths if not os.path.exists(p)]
     
     if missing:
@@ -29,6 +30,8 @@ def format_time(seconds):
 
 def show_contexts(contexts):
     """Show retrieved chunks"""
+    import streamlit as st
+    
     with st.expander(f"📄 السياقات المسترجعة ({len(contexts)})"):
         for i, text in enumerate(contexts, 1):
             st.text_area(f"مقتطف {i}", text, height=100, disabled=True)
\ No newline at end of file
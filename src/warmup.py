@@ -0,0 +1,143 @@
+"""
+Cache Warm-up - keep hot questions cached before their TTL runs out
+"""
+
+import json
+import os
+import threading
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+def load_questions_file(path):
+    """One question per line (blank lines and # comments skipped)"""
+    if not path or not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def top_questions(log_path, n, max_lines=10000):
+    """
+    The `n` most asked questions in the last `max_lines` records of a
+    metrics JSONL log (warm-up refreshes are not counted)
+    """
+    if not log_path or n <= 0 or not os.path.exists(log_path):
+        return []
+
+    with open(log_path, encoding="utf-8") as f:
+        lines = deque(f, maxlen=max_lines)
+
+    counts, first_seen = Counter(), {}
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        question = record.get("question")
+        if not question or record.get("warmup"):
+            continue
+        key = " ".join(question.split())
+        counts[key] += 1
+        first_seen.setdefault(key, question)
+
+    return [first_seen[key] for key, _ in counts.most_common(n)]
+
+
+class CacheWarmer:
+    """
+    Background loop that, every `interval` seconds, refreshes each hot
+    question whose cached answer is missing or expires within
+    `refresh_before` seconds, at most `max_workers` at a time.
+
+    Hot questions = the fixed list + the `top_n` most asked in `log_path`.
+    Keep `interval` below `refresh_before` so entries never lapse.
+
+    Every process runs its own warmer; with a `lease` (RedisLease) only
+    one of them refreshes a given question, and it checks the TTL again
+    after taking the lease, so the others' passes skip it.
+    """
+
+    def __init__(self, pipeline, questions, log_path=None, top_n=20, interval=300,
+                 refresh_before=900, max_workers=2, lease=None):
+        self.pipeline = pipeline
+        self.questions = list(questions)
+        self.log_path = log_path
+        self.top_n = top_n
+        self.interval = interval
+        self.refresh_before = refresh_before
+        self.max_workers = max(1, max_workers)
+        self.lease = lease
+        self._stop = threading.Event()
+        self._thread = None
+
+    def hot_questions(self):
+        """Fixed list + most asked, without duplicates (same canonical key)"""
+        hot, seen = [], set()
+        for question in self.questions + top_questions(self.log_path, self.top_n):
+            key = self.pipeline.cache_key(question)
+            if key and key not in seen:
+                seen.add(key)
+                hot.append(question)
+        return hot
+
+    def due(self, question):
+        """True if the cached answer is missing or about to expire"""
+        ttl = self.pipeline.cache_ttl_left(question)
+        return ttl is None or ttl < self.refresh_before
+
+    def _refresh(self, question):
+        key = self.pipeline.cache_key(question)
+        token = None
+        if self.lease is not None:
+            token = self.lease.acquire(key)
+            if token is None:
+                return False  # Another process is refreshing it
+
+        try:
+            # Another process may have refreshed it since this pass started
+            if not self.due(question):
+                return False
+            self.pipeline.refresh(question)
+            return True
+        except Exception as e:
+            print(f"⚠️ Warm-up failed for {question[:50]}: {e}")
+            return False
+        finally:
+            if token is not None:
+                self.lease.release(key, token)
+
+    def run_once(self):
+        """One pass → number of questions refreshed"""
+        if not self.pipeline.enable_cache:
+            return 0
+
+        due = [q for q in self.hot_questions() if self.due(q)]
+        if not due:
+            return 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="warmup") as executor:
+            refreshed = sum(executor.map(self._refresh, due))
+        print(f"🔥 Warm-up refreshed {refreshed}/{len(due)} questions")
+        return refreshed
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"⚠️ Warm-up pass failed: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Run passes in a daemon thread (first pass right away)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="cache-warmer", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -0,0 +1,134 @@
+"""
+Unit Tests for the HTTP Query Service
+"""
+
+import unittest
+import json
+import tempfile
+import shutil
+import threading
+import time
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+import api
+from benchmarks.fakes import FakeChatModel
+from test_helpers import make_retriever, make_pipeline
+from src.config import Config
+
+
+class TestApi(unittest.TestCase):
+    """
+    Unit tests for readiness, load shedding, timeouts, batch and stream.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.llm = FakeChatModel(latency=0.0)
+        self.pipeline = make_pipeline(make_retriever(self.temp_dir), llm=self.llm)
+        self.loaded = threading.Event()
+        self.loaded.set()
+
+        patches = [
+            mock.patch.object(Config, "API_MAX_PENDING", 2),
+            mock.patch.object(Config, "API_REQUEST_TIMEOUT", 0.2),
+            mock.patch.object(api, "get_pipeline", self._get_pipeline),
+            mock.patch.object(api, "reload_if_changed", lambda: False)
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _get_pipeline(self):
+        self.loaded.wait()
+        return self.pipeline
+
+    def _client(self):
+        """Started client, waiting until the background load finished"""
+        client = TestClient(api.app)
+        client.__enter__()
+        self.addCleanup(client.__exit__, None, None, None)
+        for _ in range(100):
+            if api.state["ready"] or api.state["error"]:
+                break
+            time.sleep(0.01)
+        return client
+
+    # ---------- Core Tests ----------
+
+    def test_ready_waits_for_pipeline(self):
+        """/ready answers 503 while loading, 200 once loaded; queries wait too"""
+        self.loaded.clear()
+        client = TestClient(api.app)
+        with client:
+            self.assertEqual(client.get("/health").status_code, 200)
+            response = client.get("/ready")
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response.json()["status"], "loading")
+            self.assertEqual(client.post("/query", json={"question": "policy"}).status_code, 503)
+
+            self.loaded.set()
+            for _ in range(100):
+                if client.get("/ready").status_code == 200:
+                    break
+                time.sleep(0.01)
+            self.assertEqual(client.get("/ready").json(), {"status": "ready"})
+
+    def test_ready_reports_failure(self):
+        """A pipeline that fails to load shows up as failed"""
+        with mock.patch.object(api, "get_pipeline", side_effect=FileNotFoundError("no index")):
+            response = self._client().get("/ready")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json(), {"status": "failed", "error": "no index"})
+
+    def test_query(self):
+        """/query returns the pipeline result"""
+        response = self._client().post("/query", json={"question": "policy"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["answer"], self.llm.answer)
+
+    def test_timeouts_keep_slots_until_work_ends(self):
+        """Timed-out calls still hold their slot: extra requests get 503, not more work"""
+        self.llm.latency = 1.0
+        client = self._client()
+
+        codes = [client.post("/query", json={"question": f"q{i}"}).status_code for i in range(6)]
+        self.assertEqual(codes, [504, 504, 503, 503, 503, 503])
+
+        # Once the two calls finish their slots are free again
+        time.sleep(1.0)
+        self.llm.latency = 0.0
+        self.assertEqual(client.post("/query", json={"question": "after"}).status_code, 200)
+
+    def test_batch(self):
+        """/query/batch answers every question; oversized batches and blank questions are rejected"""
+        client = self._client()
+        response = client.post("/query/batch", json={"questions": ["policy", "leave", "policy"]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 3)
+
+        too_many = {"questions": ["q"] * (Config.API_MAX_BATCH + 1)}
+        self.assertEqual(client.post("/query/batch", json=too_many).status_code, 422)
+
+        for blank in ("", "   "):
+            self.assertEqual(client.post("/query", json={"question": blank}).status_code, 422)
+            self.assertEqual(client.post("/query/batch", json={"questions": ["policy", blank]}).status_code, 422)
+
+    def test_stream(self):
+        """/query/stream sends contexts, tokens and a final done event"""
+        response = self._client().post("/query/stream", json={"question": "policy"})
+        self.assertEqual(response.status_code, 200)
+
+        events = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual(events[0]["type"], "contexts")
+        self.assertEqual(events[-1]["type"], "done")
+        tokens = "".join(e["text"] for e in events if e["type"] == "token")
+        self.assertEqual(tokens, self.llm.answer)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+"""
+Unit Tests for Compact Cache Entries
+"""
+
+import unittest
+import json
+import os
+import tempfile
+import shutil
+import zlib
+
+import msgpack
+
+from langchain_core.documents import Document
+
+from benchmarks.fakes import InMemoryCache
+from test_helpers import make_retriever, make_pipeline
+from src.cache_codec import encode_entry, decode_entry
+
+
+class TestCacheCodec(unittest.TestCase):
+    """
+    Unit tests for chunk-ID cache entries and rehydration.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        # ~900-character chunks like the real index
+        self.chunks = [
+            Document(
+                page_content=f"المادة {i}: " + " ".join(f"سياسة الموارد البشرية بند {i}-{j}" for j in range(35)),
+                metadata={"source": "KSSC_HR_Policies.pdf", "page": i}
+            )
+            for i in range(20)
+        ]
+        self.cache = InMemoryCache()
+        self.pipeline = self._pipeline(self._retriever("mmap", self.chunks))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _retriever(self, storage, chunks, name=None):
+        return make_retriever(os.path.join(self.temp_dir, name or storage), chunks, storage=storage, top_k=6)
+
+    def _pipeline(self, retriever):
+        return make_pipeline(retriever, cache=self.cache)
+
+    # ---------- Core Tests ----------
+
+    def test_entry_is_much_smaller_than_json(self):
+        """Chunk IDs + msgpack + zlib: an order of magnitude below the JSON result"""
+        result = self.pipeline.query("سياسة الموارد البشرية")
+        blob = self.cache.get(self.pipeline.cache_key(result["question"]))
+
+        old_format = json.dumps({k: result[k] for k in (
+            "question", "answer", "contexts", "num_contexts", "cached", "web_search_used"
+        )})
+        self.assertLess(len(blob) * 10, len(old_format.encode("utf-8")))
+        self.assertEqual(len(decode_entry(blob)["chunk_ids"]), 6)
+
+    def test_hit_rehydrates_contexts(self):
+        """A cache hit returns the same contexts as the original answer"""
+        first = self.pipeline.query("policy")
+        second = self.pipeline.query("policy")
+
+        self.assertTrue(second["cached"])
+        self.assertEqual(second["contexts"], first["contexts"])
+        self.assertEqual(second["num_contexts"], 6)
+
+    def test_missing_chunk_is_a_miss(self):
+        """Entries pointing at chunks no longer in the index are recomputed"""
+        self.pipeline.query("policy")
+        self.pipeline.retriever = self._retriever("mmap", self.chunks[:3], name="rebuilt")
+
+        result = self.pipeline.query("policy")
+        self.assertFalse(result["cached"])
+        self.assertTrue(self.pipeline.query("policy")["cached"])
+
+    def test_unreadable_entries_are_misses(self):
+        """Old JSON entries and garbage decode to None"""
+        self.assertIsNone(decode_entry(json.dumps({"answer": "old"})))
+        self.assertIsNone(decode_entry(b"not zlib"))
+
+        # Current version but incomplete → miss, not KeyError
+        for broken in ({"v": 1}, {"v": 1, "question": "q", "answer": "a", "web_search_used": False}):
+            blob = zlib.compress(msgpack.packb(broken))
+            self.assertIsNone(decode_entry(blob))
+            self.cache.setex("broken", 3600, blob)
+            self.assertFalse(self.pipeline.query("broken")["cached"])
+
+        self.cache.setex("policy", 3600, json.dumps({"answer": "old"}))
+        self.assertFalse(self.pipeline.query("policy")["cached"])
+
+    def test_faiss_chunks_by_id(self):
+        """FAISS documents are rehydrated by their docstore ID"""
+        pipeline = self._pipeline(self._retriever("faiss", self.chunks))
+        first = pipeline.query("faiss policy")
+        self.assertEqual(pipeline.query("faiss policy")["contexts"], first["contexts"])
+
+        docs = [Document(page_content="no id")]
+        self.assertEqual(decode_entry(encode_entry({"question": "q", "answer": "a", "web_search_used": False}, docs))["contexts"], ["no id"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+"""
+Unit Tests for Hedged Generation
+"""
+
+import unittest
+import os
+import subprocess
+import sys
+import time
+from unittest import mock
+
+from benchmarks.fakes import FakeChatModel
+from src.generator import Generator
+from src.hedged_generator import HedgedGenerator
+from src.metrics import render_provider_stats
+
+
+class FailingChatModel(FakeChatModel):
+    """FakeChatModel whose calls fail after `latency` seconds"""
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.latency)
+        raise RuntimeError("provider down")
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.latency)
+        raise RuntimeError("provider down")
+
+
+class TestHedgedGenerator(unittest.TestCase):
+    """
+    Unit tests for hedging, fallback and provider stats.
+    """
+
+    def _hedged(self, primary, secondary, **kwargs):
+        return HedgedGenerator(
+            [Generator(model="primary", llm=primary), Generator(model="secondary", llm=secondary)],
+            **kwargs
+        )
+
+    # ---------- Core Tests ----------
+
+    def test_fast_primary_is_not_hedged(self):
+        """A primary that answers in time is the only call"""
+        hedged = self._hedged(FakeChatModel(answer="from primary"), FakeChatModel(answer="from secondary"))
+        usage = {}
+
+        self.assertEqual(hedged.generate("q", "context", usage=usage), "from primary")
+        self.assertGreater(usage["output"], 0)
+
+        stats = hedged.provider_stats()
+        self.assertEqual(stats["custom:primary"]["wins"], 1)
+        self.assertEqual(stats["custom:secondary"]["requests"], 0)
+
+    def test_slow_primary_is_hedged(self):
+        """No first token within the delay → the secondary answers"""
+        hedged = self._hedged(
+            FakeChatModel(answer="from primary", latency=1.0, first_token_latency=1.0),
+            FakeChatModel(answer="from secondary"),
+            max_delay=0.1
+        )
+
+        start = time.perf_counter()
+        self.assertEqual(hedged.generate("q", "context"), "from secondary")
+        self.assertLess(time.perf_counter() - start, 0.8)
+
+        stats = hedged.provider_stats()
+        self.assertEqual(stats["custom:secondary"]["hedges"], 1)
+        self.assertEqual(stats["custom:secondary"]["wins"], 1)
+
+    def test_failing_primary_falls_back_at_once(self):
+        """An error starts the secondary without waiting for the delay"""
+        hedged = self._hedged(FailingChatModel(), FakeChatModel(answer="from secondary"), max_delay=5.0)
+
+        start = time.perf_counter()
+        self.assertEqual(hedged.generate("q", "context"), "from secondary")
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(hedged.provider_stats()["custom:primary"]["errors"], 1)
+
+    def test_all_providers_failing_raises(self):
+        """The last error is raised when every provider fails"""
+        hedged = self._hedged(FailingChatModel(), FailingChatModel(), max_delay=0.1)
+        with self.assertRaises(RuntimeError):
+            hedged.generate("q", "context")
+
+    def test_stream_uses_one_provider(self):
+        """Streamed tokens all come from the provider that answered first"""
+        hedged = self._hedged(
+            FakeChatModel(answer="slow primary answer", latency=1.0, first_token_latency=1.0),
+            FakeChatModel(answer="fast secondary answer", latency=0.05),
+            max_delay=0.1
+        )
+        self.assertEqual("".join(hedged.stream("q", "context")), "fast secondary answer")
+
+    def test_delay_follows_primary_p95(self):
+        """The hedge delay adapts to the primary's observed time to first token"""
+        hedged = self._hedged(
+            FakeChatModel(first_token_latency=0.05),
+            FakeChatModel(),
+            min_delay=0.01,
+            max_delay=2.0,
+            min_samples=3
+        )
+        self.assertEqual(hedged.hedge_delay(), 2.0)
+
+        for _ in range(3):
+            hedged.generate("q", "context")
+
+        self.assertLess(hedged.hedge_delay(), 0.5)
+        self.assertIn('rag_llm_wins_total{provider="custom:primary"} 3', render_provider_stats(hedged.provider_stats()))
+
+    def test_openai_streams_usage(self):
+        """Streamed OpenAI calls ask for usage, so hedged calls still count tokens"""
+        with mock.patch.dict(os.environ, {"OPENAI_API_KEY": "test"}):
+            generator = Generator(model="gpt-4o-mini", provider="openai")
+        self.assertTrue(generator.llm.stream_usage)
+
+    def test_fallback_model_follows_provider(self):
+        """The default fallback model matches LLM_FALLBACK_PROVIDER"""
+        for provider, model in (("openai", "gpt-4o-mini"), ("groq", "llama-3.3-70b-versatile")):
+            env = {k: v for k, v in os.environ.items() if k != "LLM_FALLBACK_MODEL"}
+            env["LLM_FALLBACK_PROVIDER"] = provider
+            output = subprocess.run(
+                [sys.executable, "-c", "from src.config import Config; print(Config.LLM_FALLBACK_MODEL)"],
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+                env=env,
+                capture_output=True,
+                text=True,
+                check=True
+            ).stdout.strip().splitlines()[-1]
+            self.assertEqual(output, model)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+"""
+Offline pipeline helpers shared by the unit tests
+"""
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from benchmarks.fakes import FakeChatModel, InMemoryCache
+from src.generator import Generator
+from src.metrics import MetricsRegistry
+from src.rag_pipeline import RAGPipeline
+from src.retriever import Retriever
+
+
+class CountingChatModel(FakeChatModel):
+    """FakeChatModel that counts LLM calls (generate or stream)"""
+
+    calls: int = 0
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        return super()._generate(messages, stop, run_manager, **kwargs)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        yield from super()._stream(messages, stop, run_manager, **kwargs)
+
+
+def sample_chunks(count=10):
+    """Small policy-like chunks with source/page metadata"""
+    return [
+        Document(page_content=f"Policy chunk {i}", metadata={"source": "test.pdf", "page": i})
+        for i in range(count)
+    ]
+
+
+def make_retriever(path, chunks=None, storage="mmap", top_k=2, size=32):
+    """Retriever with fake embeddings and an index built at `path`"""
+    retriever = Retriever(
+        top_k=top_k,
+        vector_store_path=path,
+        storage=storage,
+        embeddings=DeterministicFakeEmbedding(size=size)
+    )
+    retriever.create_vector_store(sample_chunks() if chunks is None else chunks)
+    return retriever
+
+
+def make_pipeline(retriever, llm=None, cache=None, metrics=None, **kwargs):
+    """RAGPipeline with a fake LLM, in-memory cache and its own metrics (no web search)"""
+    return RAGPipeline(
+        retriever,
+        Generator(llm=llm or FakeChatModel()),
+        enable_cache=True,
+        enable_web_search=False,
+        metrics=metrics or MetricsRegistry(),
+        cache=InMemoryCache() if cache is None else cache,
+        **kwargs
+    )
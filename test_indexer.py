@@ -0,0 +1,104 @@
+"""
+Unit Tests for the Offline Index Builder
+"""
+
+import unittest
+import os
+import tempfile
+import shutil
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src.indexer import build_index_from_chunks
+from src.mmap_store import MmapVectorStore
+from src.retriever import Retriever
+
+
+class FlakyEmbeddings(DeterministicFakeEmbedding):
+    """Counts embedded texts and fails after `fail_after` calls"""
+
+    calls: int = 0
+    texts: int = 0
+    fail_after: int = -1
+
+    def embed_documents(self, texts):
+        if self.calls == self.fail_after:
+            raise RuntimeError("simulated API failure")
+        self.calls += 1
+        self.texts += len(texts)
+        return super().embed_documents(texts)
+
+
+class TestIndexer(unittest.TestCase):
+    """
+    Unit tests for checkpointed embedding and atomic publish.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.target = os.path.join(self.temp_dir, "vector_store")
+        self.chunks = [
+            Document(page_content=f"Policy chunk {i}", metadata={"source": "test.pdf", "page": i})
+            for i in range(25)
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _build(self, embeddings, chunks=None):
+        return build_index_from_chunks(
+            chunks or self.chunks,
+            embeddings,
+            self.target,
+            embedding_model="fake",
+            batch_size=10,
+            progress=False
+        )
+
+    # ---------- Core Tests ----------
+
+    def test_interrupted_build_resumes(self):
+        """A failed build keeps finished batches; the rerun embeds only the rest"""
+        with self.assertRaises(RuntimeError):
+            self._build(FlakyEmbeddings(size=16, fail_after=2))
+        self.assertFalse(MmapVectorStore.exists(self.target))
+
+        resumed = FlakyEmbeddings(size=16)
+        self._build(resumed)
+
+        self.assertEqual(resumed.texts, 5)
+        self.assertEqual(len(MmapVectorStore(self.target)), 25)
+        self.assertFalse(os.path.exists(self.target + ".checkpoint"))
+
+    def test_publish_swaps_index(self):
+        """A new build replaces the live index; open readers keep the old one"""
+        self._build(FlakyEmbeddings(size=16))
+        old_store = MmapVectorStore(self.target)
+
+        self._build(FlakyEmbeddings(size=16), self.chunks[:5])
+
+        self.assertEqual(len(MmapVectorStore(self.target)), 5)
+        self.assertEqual(len(old_store), 25)
+        self.assertEqual(old_store.get_documents([20])[0].page_content, "Policy chunk 20")
+
+    def test_legacy_folder_is_replaced(self):
+        """An existing plain folder at the target path is moved aside"""
+        os.makedirs(self.target)
+        self._build(FlakyEmbeddings(size=16))
+        self.assertTrue(MmapVectorStore.exists(self.target))
+
+    def test_faiss_build(self):
+        """The legacy FAISS format is built and published the same way"""
+        embeddings = FlakyEmbeddings(size=16)
+        build_index_from_chunks(self.chunks, embeddings, self.target, embedding_model="fake",
+                                batch_size=10, progress=False, storage="faiss")
+
+        retriever = Retriever(top_k=3, vector_store_path=self.target, storage="faiss", embeddings=embeddings)
+        self.assertTrue(retriever.load_vector_store())
+        self.assertEqual(retriever.db.index.ntotal, 25)
+        self.assertEqual(retriever.retrieve("Policy chunk 7")[0].page_content, "Policy chunk 7")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+Unit Tests for Metrics
+"""
+
+import unittest
+import json
+import os
+import tempfile
+import shutil
+
+from src.metrics import MetricsRegistry, JsonlExporter, render_prometheus, span
+
+
+class TestMetrics(unittest.TestCase):
+    """
+    Unit tests for stage timing, aggregation and exporters.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.registry = MetricsRegistry(window=1000)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _result(self, generate, tier=None):
+        return {
+            "question": "q",
+            "timings": {"embed": 0.01, "generate": generate},
+            "tokens": {"input": 10, "output": 5},
+            "cache_tier": tier
+        }
+
+    # ---------- Core Tests ----------
+
+    def test_span_accumulates(self):
+        """span adds time to the same stage on repeated use"""
+        timings = {}
+        with span(timings, "search"):
+            pass
+        first = timings["search"]
+        with span(timings, "search"):
+            pass
+        self.assertGreaterEqual(timings["search"], first)
+
+    def test_quantiles_and_counters(self):
+        """Snapshot has per-stage quantiles, tokens and cache hits"""
+        for i in range(1, 101):
+            self.registry.observe(self._result(i / 100))
+        self.registry.observe(self._result(0.0, tier="redis"))
+
+        snap = self.registry.snapshot()
+        self.assertEqual(snap["queries"], 101)
+        self.assertAlmostEqual(snap["stages"]["generate"]["p50"], 0.5, places=2)
+        self.assertGreater(snap["stages"]["generate"]["p99"], snap["stages"]["generate"]["p95"])
+        self.assertEqual(snap["tokens"], {"input": 1010, "output": 505})
+        self.assertEqual(snap["cache_hits"], {"redis": 1})
+        self.assertEqual(snap["cache_misses"], 100)
+
+    def test_prometheus_text(self):
+        """Prometheus output has summary lines per stage"""
+        self.registry.observe(self._result(0.2))
+        text = render_prometheus(self.registry)
+        self.assertIn('rag_stage_seconds{stage="generate",quantile="0.95"}', text)
+        self.assertIn('rag_stage_seconds_count{stage="embed"} 1', text)
+        self.assertIn("rag_cache_misses_total 1", text)
+
+    def test_jsonl_exporter(self):
+        """Each observed query becomes one JSON line"""
+        path = os.path.join(self.temp_dir, "metrics.jsonl")
+        self.registry.add_exporter(JsonlExporter(path))
+        self.registry.observe(self._result(0.2))
+        self.registry.observe(self._result(0.3, tier="redis"))
+
+        with open(path, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([r["cache_tier"] for r in records], [None, "redis"])
+        self.assertEqual(records[0]["timings"]["generate"], 0.2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+"""
+Unit Tests for the Memory-Mapped Vector Store
+"""
+
+import unittest
+from unittest import mock
+import os
+import tempfile
+import shutil
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_community.vectorstores import FAISS
+
+from src import mmap_store
+from src.mmap_store import MmapVectorStore
+from src.retriever import Retriever
+
+
+class TestMmapVectorStore(unittest.TestCase):
+    """
+    Unit tests for MmapVectorStore and the "mmap" Retriever storage.
+    Runs offline with a deterministic fake embedder.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.embeddings = DeterministicFakeEmbedding(size=64)
+        self.docs = [
+            Document(
+                page_content=f"Test document {i} about retrieval.",
+                metadata={"source": "test.pdf", "page": i}
+            )
+            for i in range(20)
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _build(self):
+        vectors = self.embeddings.embed_documents([d.page_content for d in self.docs])
+        return MmapVectorStore.build(self.temp_dir, vectors, self.docs)
+
+    # ---------- Core Tests ----------
+
+    def test_build_writes_no_pickle(self):
+        """Store is made of plain files only"""
+        self._build()
+        self.assertTrue(MmapVectorStore.exists(self.temp_dir))
+        self.assertFalse(any(f.endswith(".pkl") for f in os.listdir(self.temp_dir)))
+
+    def test_vectors_are_memory_mapped(self):
+        """Loaded vectors are a read-only memmap"""
+        self._build()
+        store = MmapVectorStore(self.temp_dir)
+        self.assertIsInstance(store.vectors, np.memmap)
+        self.assertEqual(len(store), len(self.docs))
+
+    def test_search_matches_faiss(self):
+        """Nearest rows match a FAISS flat L2 index"""
+        store = self._build()
+        faiss_db = FAISS.from_documents(self.docs, self.embeddings)
+
+        query = self.embeddings.embed_query("document 7")
+        rows, _ = store.search(query, 5)
+        expected = faiss_db.similarity_search_by_vector(query, k=5)
+
+        self.assertEqual(
+            [d.page_content for d in store.get_documents(rows)],
+            [d.page_content for d in expected]
+        )
+
+    def test_get_documents_keeps_order_and_metadata(self):
+        """Documents come back in the requested order with metadata"""
+        store = self._build()
+        docs = store.get_documents([3, 0, 11])
+        self.assertEqual([d.metadata["page"] for d in docs], [3, 0, 11])
+        self.assertTrue(all(d.id for d in docs))
+
+    def test_compact_precisions_rescore_exactly(self):
+        """float16/int8 stores are smaller and return the exact top-k"""
+        vectors = self.embeddings.embed_documents([d.page_content for d in self.docs])
+        queries = [self.embeddings.embed_query(f"query {i}") for i in range(5)]
+
+        for precision, max_ratio in (("float16", 0.6), ("int8", 0.35)):
+            with self.subTest(precision=precision):
+                path = os.path.join(self.temp_dir, precision)
+                store = MmapVectorStore.build(path, vectors, self.docs, precision=precision)
+
+                self.assertEqual(MmapVectorStore(path).precision, precision)
+                self.assertLess(store.memory_report()["memory_ratio"], max_ratio)
+                self.assertEqual(store.recall_at_k(queries, 3), 1.0)
+
+    def test_compressed_text_round_trip(self):
+        """Compressed chunk text reads back unchanged"""
+        vectors = self.embeddings.embed_documents([d.page_content for d in self.docs])
+        store = MmapVectorStore.build(self.temp_dir, vectors, self.docs, compress_text=True)
+        self.assertEqual(store.get_documents([4])[0].page_content, self.docs[4].page_content)
+
+    def test_search_batch_matches_single_search(self):
+        """Batched search returns the same rows as one search per query"""
+        vectors = self.embeddings.embed_documents([d.page_content for d in self.docs])
+        queries = [self.embeddings.embed_query(f"query {i}") for i in range(7)]
+
+        # Small blocks exercise the running top-k merge
+        with mock.patch.object(mmap_store, "BLOCK_SIZE", 6):
+            for precision in ("float32", "int8"):
+                with self.subTest(precision=precision):
+                    path = os.path.join(self.temp_dir, precision)
+                    store = MmapVectorStore.build(path, vectors, self.docs, precision=precision)
+
+                    rows, _ = store.search_batch(queries, 4)
+                    self.assertEqual(rows, [store.search(q, 4)[0] for q in queries])
+
+    def test_retrieve_batch(self):
+        """retrieve_batch matches a per-query search of the underlying store"""
+        questions = ["document 1", "document 2", "retrieval"]
+
+        for storage in ("mmap", "faiss"):
+            with self.subTest(storage=storage):
+                retriever = Retriever(
+                    top_k=3,
+                    vector_store_path=os.path.join(self.temp_dir, storage),
+                    storage=storage,
+                    embeddings=self.embeddings
+                )
+                retriever.create_vector_store(self.docs)
+
+                expected = []
+                for q in questions:
+                    vector = self.embeddings.embed_query(q)
+                    if storage == "mmap":
+                        rows, _ = retriever.db.search(vector, 3)
+                        docs = retriever.db.get_documents(rows)
+                    else:
+                        docs = retriever.db.similarity_search_by_vector(vector, k=3)
+                    expected.append([d.page_content for d in docs])
+
+                batch = retriever.retrieve_batch(questions)
+                self.assertEqual([[d.page_content for d in docs] for docs in batch], expected)
+
+    def test_retriever_save_and_load(self):
+        """Retriever builds, reloads and retrieves with mmap storage"""
+        retriever = Retriever(top_k=3, vector_store_path=self.temp_dir, embeddings=self.embeddings)
+        retriever.create_vector_store(self.docs)
+        retriever.save()
+
+        new_retriever = Retriever(top_k=3, vector_store_path=self.temp_dir, embeddings=self.embeddings)
+        self.assertTrue(new_retriever.load_vector_store())
+        self.assertEqual(len(new_retriever.retrieve("retrieval")), 3)
+
+    def test_load_missing_store(self):
+        """Loading an empty folder fails safely"""
+        retriever = Retriever(vector_store_path=self.temp_dir, embeddings=self.embeddings)
+        self.assertFalse(retriever.load_vector_store())
+        self.assertIsNone(retriever.db)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+"""
+Unit Tests for the Shared Pipeline
+"""
+
+import unittest
+import os
+import tempfile
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from test_helpers import sample_chunks, make_pipeline
+from src import shared_pipeline
+from src.config import Config
+from src.indexer import build_index_from_chunks
+
+
+class TestSharedPipeline(unittest.TestCase):
+    """
+    Unit tests for the process-wide singleton and index hot-swap.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "vector_store")
+        self.embeddings = DeterministicFakeEmbedding(size=32)
+        self.builds = 0
+
+        self._build_index(10)
+        patches = [
+            mock.patch.object(Config, "VECTOR_STORE_PATH", self.path),
+            mock.patch.object(Config, "VECTOR_STORE_FORMAT", "mmap"),
+            mock.patch.object(shared_pipeline, "build_pipeline", self._fake_build),
+            mock.patch.object(shared_pipeline, "_pipeline", None),
+            mock.patch.object(shared_pipeline, "_index_stamp", None),
+            mock.patch.object(shared_pipeline, "_failed_stamp", None)
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _build_index(self, count):
+        build_index_from_chunks(sample_chunks(count), self.embeddings, self.path, "fake", progress=False)
+
+    def _fake_build(self):
+        """build_pipeline without OpenAI/Redis; slow, so racing callers overlap"""
+        self.builds += 1
+        time.sleep(0.1)
+        retriever = shared_pipeline._make_retriever(embeddings=self.embeddings)
+        self.assertTrue(retriever.load_vector_store())
+        return make_pipeline(retriever)
+
+    # ---------- Core Tests ----------
+
+    def test_concurrent_get_pipeline_builds_once(self):
+        """Racing first calls share one pipeline"""
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            pipelines = list(executor.map(lambda _: shared_pipeline.get_pipeline(), range(8)))
+
+        self.assertEqual(self.builds, 1)
+        self.assertTrue(all(p is pipelines[0] for p in pipelines))
+
+    def test_reload_index_swaps_retriever(self):
+        """reload_index loads the rebuilt index into the same pipeline"""
+        pipeline = shared_pipeline.get_pipeline()
+        old_retriever = pipeline.retriever
+
+        self._build_index(4)
+        self.assertTrue(shared_pipeline.reload_index())
+
+        self.assertIs(shared_pipeline.get_pipeline(), pipeline)
+        self.assertIsNot(pipeline.retriever, old_retriever)
+        self.assertEqual(len(pipeline.retriever.db), 4)
+        self.assertEqual(len(old_retriever.db), 10)
+
+    def test_reload_if_changed(self):
+        """Only a rebuilt index triggers a reload, and only once"""
+        self.assertFalse(shared_pipeline.reload_if_changed())
+        pipeline = shared_pipeline.get_pipeline()
+        self.assertFalse(shared_pipeline.reload_if_changed())
+
+        self._build_index(4)
+        self.assertTrue(shared_pipeline.reload_if_changed())
+        self.assertEqual(len(pipeline.retriever.db), 4)
+        self.assertFalse(shared_pipeline.reload_if_changed())
+
+    def test_concurrent_reload_loads_once(self):
+        """Requests racing on a rebuilt index reload it once"""
+        shared_pipeline.get_pipeline()
+        self._build_index(4)
+
+        loads = []
+        make_retriever = shared_pipeline._make_retriever
+
+        def counting_make_retriever(embeddings=None):
+            loads.append(threading.get_ident())
+            time.sleep(0.05)
+            return make_retriever(embeddings)
+
+        with mock.patch.object(shared_pipeline, "_make_retriever", counting_make_retriever):
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                reloaded = list(executor.map(lambda _: shared_pipeline.reload_if_changed(), range(8)))
+
+        self.assertEqual(len(loads), 1)
+        self.assertEqual(reloaded.count(True), 1)
+
+    def test_broken_index_is_not_retried(self):
+        """A build that fails to load is tried once, until a new build replaces it"""
+        pipeline = shared_pipeline.get_pipeline()
+        with open(os.path.join(self.path, "meta.json"), "w", encoding="utf-8") as f:
+            f.write("not json")
+        os.utime(os.path.join(self.path, "meta.json"), (time.time() + 5, time.time() + 5))
+
+        loads = []
+        make_retriever = shared_pipeline._make_retriever
+
+        def counting_make_retriever(embeddings=None):
+            loads.append(1)
+            return make_retriever(embeddings)
+
+        with mock.patch.object(shared_pipeline, "_make_retriever", counting_make_retriever):
+            self.assertEqual([shared_pipeline.reload_if_changed() for _ in range(5)], [False] * 5)
+            self.assertEqual(len(loads), 1)
+            self.assertEqual(len(pipeline.retriever.db), 10)
+
+            self._build_index(4)
+            self.assertTrue(shared_pipeline.reload_if_changed())
+        self.assertEqual(len(pipeline.retriever.db), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
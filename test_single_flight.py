@@ -0,0 +1,174 @@
+"""
+Unit Tests for Request Coalescing
+"""
+
+import unittest
+import tempfile
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fakes import InMemoryCache
+from test_helpers import CountingChatModel, make_retriever, make_pipeline
+from src.single_flight import SingleFlight, RedisLease
+
+
+class TestSingleFlight(unittest.TestCase):
+    """
+    Unit tests for in-process and cross-process coalescing.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.retriever = make_retriever(self.temp_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _pipeline(self, llm, cache=None, lease=None):
+        return make_pipeline(self.retriever, llm=llm, cache=cache, lease=lease)
+
+    # ---------- Core Tests ----------
+
+    def test_do_shares_result_and_errors(self):
+        """Concurrent callers of one key run fn once; errors reach every caller"""
+        flights = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+        runs = []
+
+        def slow():
+            runs.append(1)
+            started.set()
+            release.wait()
+            return "answer"
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            leader = executor.submit(flights.do, "k", slow)
+            started.wait()
+            followers = [executor.submit(flights.do, "k", slow) for _ in range(3)]
+            time.sleep(0.05)
+            release.set()
+
+        self.assertEqual(leader.result(), ("answer", False))
+        self.assertEqual([f.result() for f in followers], [("answer", True)] * 3)
+        self.assertEqual(len(runs), 1)
+        self.assertEqual(flights.in_flight(), 0)
+
+        def fail():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            flights.do("k", fail)
+
+    def test_concurrent_queries_call_llm_once(self):
+        """Identical questions in flight at once share one LLM call"""
+        llm = CountingChatModel(latency=0.2)
+        pipeline = self._pipeline(llm)
+
+        questions = ["ما مدة فترة الاختبار؟", "  ما مدة   فترة الاختبار؟"] * 4
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(pipeline.query, questions))
+
+        self.assertEqual(llm.calls, 1)
+        self.assertEqual({r["answer"] for r in results}, {llm.answer})
+        self.assertEqual(pipeline.metrics.snapshot()["cache_hits"].get("inflight"), 7)
+
+    def test_batch_answers_duplicates_once(self):
+        """Repeated questions in one batch are generated once"""
+        llm = CountingChatModel()
+        pipeline = self._pipeline(llm)
+
+        results = pipeline.query_batch(["policy", "policy ", "other"])
+
+        self.assertEqual(llm.calls, 2)
+        self.assertEqual(results[1]["question"], "policy ")
+        self.assertEqual(results[1]["cache_tier"], "inflight")
+
+    def test_leader_checks_cache_again(self):
+        """A caller that missed just before the previous answer was stored reuses it"""
+        cache = InMemoryCache()
+        self._pipeline(CountingChatModel(answer="stored meanwhile"), cache=cache).query("policy")
+
+        llm = CountingChatModel()
+        pipeline = self._pipeline(llm, cache=cache)
+        result = pipeline._query_uncached("policy", False, pipeline._new_trace())
+
+        self.assertEqual(llm.calls, 0)
+        self.assertEqual(result["answer"], "stored meanwhile")
+
+    def test_batch_joins_query_in_flight(self):
+        """A batch miss waits for an identical query already running"""
+        llm = CountingChatModel(latency=0.3)
+        pipeline = self._pipeline(llm)
+
+        running = threading.Thread(target=pipeline.query, args=("policy",))
+        running.start()
+        time.sleep(0.1)
+        results = pipeline.query_batch(["policy"])
+        running.join()
+
+        self.assertEqual(llm.calls, 1)
+        self.assertEqual(results[0]["cache_tier"], "inflight")
+
+    def test_stream_coalesces_both_ways(self):
+        """Streams join running queries, and queries join running streams"""
+        llm = CountingChatModel(latency=0.3, first_token_latency=0.1)
+        pipeline = self._pipeline(llm)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            stream = executor.submit(lambda: list(pipeline.stream_query("policy")))
+            time.sleep(0.05)
+            joined = executor.submit(pipeline.query, "policy")
+
+            events = stream.result()
+            self.assertEqual(joined.result()["cache_tier"], "inflight")
+        self.assertEqual(events[-1]["type"], "done")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            query = executor.submit(pipeline.query, "other")
+            time.sleep(0.05)
+            events = list(pipeline.stream_query("other"))
+
+            self.assertEqual(events[-1]["result"]["cache_tier"], "inflight")
+            self.assertEqual(events[1]["text"], query.result()["answer"])
+        self.assertEqual(llm.calls, 2)
+
+    def test_lease_waits_for_other_process(self):
+        """A held lease makes the second process wait for the cached answer"""
+        cache = InMemoryCache()
+        llm = CountingChatModel()
+        pipeline = self._pipeline(llm, cache=cache, lease=RedisLease(cache, lease=2, poll_interval=0.01))
+
+        # Another process holds the lock and stores its answer shortly after
+        other = self._pipeline(CountingChatModel(answer="from other process"), cache=cache)
+        token = pipeline.lease.acquire("policy")
+
+        def finish_other():
+            time.sleep(0.1)
+            other.query("policy")
+            pipeline.lease.release("policy", token)
+
+        threading.Thread(target=finish_other).start()
+        result = pipeline.query("policy")
+
+        self.assertEqual(llm.calls, 0)
+        self.assertEqual(result["answer"], "from other process")
+        self.assertEqual(result["cache_tier"], "redis")
+
+    def test_expired_lease_computes_locally(self):
+        """If the holder never finishes, the waiter computes after the lease"""
+        cache = InMemoryCache()
+        llm = CountingChatModel()
+        pipeline = self._pipeline(llm, cache=cache, lease=RedisLease(cache, lease=0.1, poll_interval=0.01))
+        pipeline.lease.acquire("policy")
+
+        result = pipeline.query("policy")
+
+        self.assertEqual(llm.calls, 1)
+        self.assertFalse(result["cached"])
+        self.assertFalse(cache.exists("lock:policy"))
+
+
+if __name__ == "__main__":
+    unittest.main()
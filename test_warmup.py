@@ -0,0 +1,115 @@
+"""
+Unit Tests for Cache Warm-up
+"""
+
+import unittest
+import json
+import os
+import tempfile
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fakes import InMemoryCache
+from test_helpers import CountingChatModel, make_retriever, make_pipeline
+from src.metrics import MetricsRegistry, JsonlExporter
+from src.single_flight import RedisLease
+from src.warmup import CacheWarmer, top_questions
+
+
+class TestWarmup(unittest.TestCase):
+    """
+    Unit tests for hot-question selection and TTL-based refresh.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.temp_dir, "queries.jsonl")
+
+        registry = MetricsRegistry()
+        registry.add_exporter(JsonlExporter(self.log_path))
+        self.cache = InMemoryCache()
+        self.pipeline = make_pipeline(
+            make_retriever(os.path.join(self.temp_dir, "index")),
+            cache=self.cache,
+            metrics=registry,
+            cache_ttl=3600
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _warmer(self, questions, top_n=0):
+        return CacheWarmer(self.pipeline, questions, log_path=self.log_path, top_n=top_n, refresh_before=600)
+
+    # ---------- Core Tests ----------
+
+    def test_top_questions_from_log(self):
+        """Most asked questions first; warm-up records are ignored"""
+        records = (
+            [{"question": "annual leave"}] * 2
+            + [{"question": " annual   leave "}]
+            + [{"question": "probation"}] * 2
+            + [{"question": "warm only", "warmup": True}] * 5
+        )
+        with open(self.log_path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+            f.write("not json\n")
+
+        self.assertEqual(top_questions(self.log_path, 5), ["annual leave", "probation"])
+        self.assertEqual(top_questions(self.log_path, 1), ["annual leave"])
+        self.assertEqual(top_questions(os.path.join(self.temp_dir, "missing.jsonl"), 5), [])
+
+    def test_run_once_refreshes_due_questions(self):
+        """Missing and near-expiry answers are refreshed; fresh ones are left alone"""
+        self.pipeline.query("fresh")
+        self.cache.setex("expiring", 60, json.dumps({"answer": "old"}))
+
+        warmer = self._warmer(["fresh", "expiring", "missing", "missing "])
+        self.assertEqual(warmer.run_once(), 2)
+
+        self.assertGreater(self.pipeline.cache_ttl_left("expiring"), 600)
+        self.assertTrue(self.pipeline.query("missing")["cached"])
+        self.assertEqual(warmer.run_once(), 0)
+
+    def test_logged_questions_are_warmed(self):
+        """Top-N questions from the query log are kept cached too"""
+        self.pipeline.query("probation")
+        self.cache.flushdb()
+
+        self.assertEqual(self._warmer([], top_n=5).run_once(), 1)
+        self.assertTrue(self.pipeline.query("probation")["cached"])
+
+        # The refresh itself is logged as warm-up, not as a user question
+        with open(self.log_path, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([r["warmup"] for r in records], [False, True, False])
+
+        # ...and kept out of the user query counters and latency windows
+        snap = self.pipeline.metrics.snapshot()
+        self.assertEqual((snap["queries"], snap["cache_misses"], snap["warmups"]), (2, 1, 1))
+        self.assertEqual(snap["stages"]["total"]["count"], 2)
+
+    def test_processes_refresh_each_question_once(self):
+        """Warmers of several processes sharing a cache split the work"""
+        questions = [f"hot question {i}" for i in range(4)]
+        llms = [CountingChatModel(latency=0.05) for _ in range(3)]
+        warmers = [
+            CacheWarmer(
+                make_pipeline(self.pipeline.retriever, llm=llm, cache=self.cache),
+                questions,
+                refresh_before=600,
+                lease=RedisLease(self.cache, lease=5, prefix="warmup:")
+            )
+            for llm in llms
+        ]
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            refreshed = list(executor.map(lambda w: w.run_once(), warmers))
+
+        self.assertEqual(sum(refreshed), 4)
+        self.assertEqual(sum(llm.calls for llm in llms), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()